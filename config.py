@@ -1,16 +1,85 @@
 # Configuration file for Web Security Scanner
 
+import os
+
 # Scanner settings
 TIMEOUT = 10  # Request timeout in seconds
-MAX_THREADS = 5  # Maximum concurrent threads
+MAX_THREADS = 5  # Maximum concurrent payload workers per injection point
+PAYLOAD_POOL_SIZE = 20  # Payload worker threads shared by all scanners on one HTTP client
+HTTP_MAX_IN_FLIGHT = 10  # Maximum requests in flight on the async HTTP engine
+POOL_MAX_HOSTS = 10  # Number of per-host connection pools kept open
+REQUEST_CACHE_SIZE = 256  # Maximum cached responses for repeated safe requests
+REQUEST_CACHE_TTL = 300  # Seconds a cached response stays valid
+MAX_BODY_SIZE = 5 * 1024 * 1024  # Maximum response body bytes read per request
+MAX_DECOMPRESSION_RATIO = 100  # Stop reading when decoded/raw size exceeds this ratio
+STREAM_CHUNK_SIZE = 16 * 1024  # Bytes per chunk fed to streaming detectors
+STREAM_DRAIN_LIMIT = 64 * 1024  # Bytes drained after early stop to keep the connection reusable
+BATCH_PROBE_MIN_PARAMETERS = 4  # Parameters a request needs before discovery probes are batched
+BATCH_PROBE_LENGTH_TOLERANCE = 100  # Body length change (bytes) that marks a batched probe as having changed the page
+
+# Rate limiting
+MAX_RPS = 0  # Maximum requests per second per host (0 = unlimited)
+AIMD_INITIAL_CONCURRENCY = 2  # Starting concurrent requests per host
+AIMD_LATENCY_FACTOR = 2.0  # Back off when latency exceeds this multiple of the baseline
+AIMD_DECREASE_FACTOR = 0.5  # Concurrency multiplier applied on congestion
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 
 # SQL Injection settings
-SQLI_DETECTION_TIMEOUT = 5  # Time-based SQLi detection delay
+SQLI_DETECTION_TIMEOUT = 5  # Maximum injected delay for time-based SQLi (seconds)
+TIME_BASED_BASELINE_SAMPLES = 5  # Normal requests sampled per endpoint before time-based tests
+TIME_BASED_MIN_DELAY = 1  # Smallest injected delay (seconds)
+TIME_BASED_CONFIRMATIONS = 2  # Delayed/control rounds required before reporting
+TIME_BASED_PER_ENDPOINT = 3  # Concurrent time-based tests (different parameters) allowed per endpoint
 SQLI_MAX_PAYLOADS = 50  # Maximum payloads to test per parameter
 
 # XSS settings
 XSS_MAX_PAYLOADS = 30  # Maximum XSS payloads to test
+XSS_FEATURE_CACHE_SIZE = 1024  # Payloads whose analysed features the reflection detector keeps
+
+# Payload ordering
+LEARNED_PAYLOAD_ORDER = True  # Order payloads by recorded hit rates
+PAYLOAD_STATS_FILE = os.path.join(os.path.expanduser("~"), ".web_security_scanner",
+                                  "payload_stats.json")  # Per-user payload hit statistics
+PAYLOAD_STATS_MIN_SAMPLES = 5  # Attempts needed before a fingerprint's own stats are used
+
+# Crawler settings
+CRAWL_MAX_DEPTH = 3  # Link depth followed from the start URL
+CRAWL_MAX_PAGES = 200  # Maximum pages fetched per crawl
+CRAWL_WORKERS = 5  # Concurrent page fetches while crawling
+CRAWL_FRONTIER_MEMORY = 10000  # Queued URLs kept in memory before spilling to disk
+CRAWL_BLOOM_ERROR_RATE = 0.001  # False-positive rate of the visited-URL Bloom filter
+CRAWL_EXCLUDE = [r"log-?out", r"sign-?out"]  # URL patterns never followed
+CRAWL_SKIP_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".css", ".js",
+                         ".woff", ".woff2", ".ttf", ".pdf", ".zip", ".gz", ".tar", ".rar",
+                         ".7z", ".exe", ".mp3", ".mp4", ".avi", ".mov")  # Never fetched
+TEMPLATE_REPRESENTATIVES = 2  # Pages per endpoint template that get the full payload battery
+
+# Checkpoint settings
+CHECKPOINT_DIR = "checkpoints"  # Resumable progress files of command-line scans
+CHECKPOINT_FLUSH_RECORDS = 50  # Progress records buffered before a batched write
+CHECKPOINT_FLUSH_INTERVAL = 2.0  # Seconds before buffered records are written anyway
+
+# Incremental rescans
+FINGERPRINT_FILE = "scan_fingerprints.json"  # Page fingerprints and findings from previous runs
+
+# Batch mode (-iL)
+BATCH_CONCURRENCY = 4  # Targets scanned at the same time
+BATCH_PER_HOST = 1  # Targets of one host scanned at the same time
+
+# Distributed scans
+WORK_LEASE_SECONDS = 120  # Seconds a worker holds a job before it is re-queued (renewed while alive)
+WORK_MAX_ATTEMPTS = 3  # Leases per job before it is marked failed
+WORK_POLL_INTERVAL = 1.0  # Seconds between queue polls when no job is available
+
+# Web GUI
+SSE_KEEPALIVE_INTERVAL = 15  # Seconds between keep-alive comments on idle event streams
+GUI_SCAN_WORKERS = 2  # Scans the GUI runs at the same time
+GUI_SCAN_QUEUE_SIZE = 20  # Scans waiting for a worker before new ones get HTTP 429
+GUI_RETRY_AFTER = 30  # Retry-After seconds sent before any scan duration is known
+GUI_DB_FILE = "gui_scans.db"  # SQLite store of GUI scans and findings
+GUI_CACHE_SIZE = 100  # Scans whose status and event log are kept in memory
+GUI_PAGE_SIZE = 50  # Findings per page of the results endpoint
+GUI_MAX_PAGE_SIZE = 500  # Largest per_page a client may request
 
 # Report settings
 REPORT_DIR = "reports"
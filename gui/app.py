@@ -2,22 +2,76 @@
 Flask Web GUI for Web Security Scanner
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file, stream_with_context
 import os
-import json
+import queue
 import threading
+import uuid
+from collections import OrderedDict
 from datetime import datetime
 
 from scanners.sql_injection import SQLInjectionScanner
 from scanners.xss_scanner import XSSScanner
 from utils.report_generator import ReportGenerator
+from utils.http_client import HTTPClient
+from utils.attack_surface import AttackSurface
+from utils.injection_points import InjectionPointRegistry
+from gui.events import ScanEvents
+from gui.scheduler import ScanScheduler
+from gui.store import ScanStore
+from config import GUI_CACHE_SIZE, GUI_PAGE_SIZE, GUI_MAX_PAGE_SIZE
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 
-# Store scan results in memory (for demo purposes)
-scan_results = {}
-scan_status = {}
+# Scans and findings persist in SQLite; only hot scans stay in memory
+store = ScanStore()
+
+# Event logs of running and recently finished scans (bounded, see events_for)
+scan_events = OrderedDict()
+events_lock = threading.Lock()
+
+# Scans run on a fixed worker pool; extra submissions wait in a bounded queue
+scheduler = ScanScheduler()
+
+
+def update_status(scan_id, **fields):
+    """Update a scan's status and push it to the scan's event stream"""
+    status = store.update_status(scan_id, **fields)
+    events = events_for(scan_id)
+    if events is not None:
+        events.publish('status', status)
+
+
+def events_for(scan_id, create=False):
+    """Event log of a scan
+    
+    Live scans keep theirs in memory. Finished scans beyond GUI_CACHE_SIZE
+    are dropped and rebuilt from the store (final status, findings, end)
+    when someone asks for them again.
+    """
+    with events_lock:
+        events = scan_events.get(scan_id)
+        if events is None and create:
+            events = scan_events[scan_id] = ScanEvents()
+        if events is not None:
+            scan_events.move_to_end(scan_id)
+            # Only finished scans are evicted; running ones are bounded by the scheduler
+            for old_id in [i for i, e in scan_events.items() if e.closed][:max(0, len(scan_events) - GUI_CACHE_SIZE)]:
+                del scan_events[old_id]
+            return events
+    
+    status = store.status(scan_id)
+    if status is None:
+        return None
+    events = ScanEvents()
+    events.publish('status', status)
+    for vuln in store.findings(scan_id)[1]:
+        events.publish('finding', vuln)
+    if status['status'] not in ('queued', 'running'):
+        events.publish('end', {'scan_id': scan_id})
+    events.close()
+    return events
 
 
 @app.route('/')
@@ -35,50 +89,132 @@ def start_scan():
     
     if not url:
         return jsonify({'error': 'URL is required'}), 400
+    try:
+        priority = int(data.get('priority', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'priority must be an integer'}), 400
     
-    # Generate scan ID
-    scan_id = f"scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    # Generate scan ID (timestamp for readability, random suffix so IDs never collide)
+    scan_id = f"scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
     
     # Initialize scan status
-    scan_status[scan_id] = {
-        'status': 'running',
-        'progress': 0,
-        'message': 'Initializing scan...'
-    }
+    store.create(scan_id, url, scan_type)
+    events_for(scan_id, create=True)
+    update_status(scan_id, status='queued', progress=0, message='Waiting for a free scan worker...')
     
-    # Start scan in background thread
-    thread = threading.Thread(target=run_scan, args=(scan_id, url, scan_type))
-    thread.daemon = True
-    thread.start()
+    # Queue the scan for the worker pool
+    try:
+        scheduler.submit(run_scan, scan_id, url, scan_type, priority=priority)
+    except queue.Full:
+        store.delete(scan_id)
+        with events_lock:
+            scan_events.pop(scan_id, None)
+        retry_after = scheduler.retry_after()
+        return jsonify({
+            'error': 'Scan queue is full, try again later',
+            'retry_after': retry_after
+        }), 429, {'Retry-After': str(retry_after)}
     
     return jsonify({
         'scan_id': scan_id,
-        'message': 'Scan started successfully'
+        'message': 'Scan queued successfully',
+        'queued': scheduler.pending()
     })
 
 
 @app.route('/api/scan/<scan_id>/status', methods=['GET'])
 def get_scan_status(scan_id):
     """Get scan status"""
-    if scan_id not in scan_status:
+    status = store.status(scan_id)
+    if status is None:
         return jsonify({'error': 'Scan not found'}), 404
     
-    return jsonify(scan_status[scan_id])
+    return jsonify(status)
+
+
+@app.route('/api/scan/<scan_id>/events', methods=['GET'])
+def stream_scan_events(scan_id):
+    """Stream scan progress and findings as Server-Sent Events
+    
+    Events: 'status' (same body as /status), 'finding' (one vulnerability,
+    sent as soon as a scanner reports it) and 'end'. Reconnecting clients
+    send Last-Event-ID and only receive the events they missed.
+    """
+    events = events_for(scan_id)
+    if events is None:
+        return jsonify({'error': 'Scan not found'}), 404
+    
+    try:
+        last_id = int(request.headers.get('Last-Event-ID', request.args.get('last_id', 0)))
+    except ValueError:
+        last_id = 0
+    
+    return Response(
+        stream_with_context(events.stream(last_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def page_args():
+    """(page, per_page, offset) from the query string"""
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(max(1, request.args.get('per_page', GUI_PAGE_SIZE, type=int)), GUI_MAX_PAGE_SIZE)
+    return page, per_page, (page - 1) * per_page
+
+
+@app.route('/api/scans', methods=['GET'])
+def list_scans():
+    """List scans, newest first (filters: target or url, status; paginated with page/per_page)"""
+    page, per_page, offset = page_args()
+    total, scans = store.scans(
+        url=request.args.get('target') or request.args.get('url'), status=request.args.get('status'),
+        offset=offset, limit=per_page
+    )
+    return jsonify({'scans': scans, 'total': total, 'page': page, 'per_page': per_page})
 
 
 @app.route('/api/scan/<scan_id>/results', methods=['GET'])
 def get_scan_results(scan_id):
-    """Get scan results"""
-    if scan_id not in scan_results:
+    """Get scan results, a page at a time
+    
+    Query parameters: page, per_page, and the filters severity, type and
+    url. Findings are available while the scan is still running.
+    """
+    scan = store.scan(scan_id)
+    if scan is None:
         return jsonify({'error': 'Results not found'}), 404
     
-    return jsonify(scan_results[scan_id])
+    page, per_page, offset = page_args()
+    total, vulnerabilities = store.findings(
+        scan_id,
+        severity=request.args.get('severity'),
+        vuln_type=request.args.get('type'),
+        url=request.args.get('url'),
+        offset=offset,
+        limit=per_page
+    )
+    counts = store.severity_counts(scan_id)
+    return jsonify({
+        'url': scan['url'],
+        'scan_type': scan['scan_type'],
+        'status': scan['status'],
+        'timestamp': scan['finished'] or scan['created'],
+        'vulnerabilities': vulnerabilities,
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'total_vulnerabilities': sum(counts.values()),
+        'high_severity': counts.get('High', 0),
+        'medium_severity': counts.get('Medium', 0),
+        'low_severity': counts.get('Low', 0)
+    })
 
 
 @app.route('/api/scan/<scan_id>/report', methods=['GET'])
 def download_report(scan_id):
     """Download scan report"""
-    if scan_id not in scan_results:
+    if store.scan(scan_id) is None:
         return jsonify({'error': 'Results not found'}), 404
     
     # Generate report
@@ -88,65 +224,55 @@ def download_report(scan_id):
     # Create reports directory if not exists
     os.makedirs('reports', exist_ok=True)
     
-    report_gen.generate(scan_results[scan_id]['vulnerabilities'], f"reports/{scan_id}_report")
+    report_gen.generate(store.findings(scan_id)[1], f"{scan_id}_report")
     
-    return send_file(report_path, as_attachment=True)
+    return send_file(os.path.abspath(report_path), as_attachment=True)
 
 
 def run_scan(scan_id, url, scan_type):
-    """Run scan in background"""
+    """Run scan in background (on a scheduler worker)"""
+    update_status(scan_id, status='running', progress=0, message='Initializing scan...')
+    client = HTTPClient()
+    surface = AttackSurface(client)
+    points = InjectionPointRegistry()
+    events = events_for(scan_id, create=True)
+    
+    def on_finding(vuln):
+        # Stored first, so a client reading /results after the event sees it
+        store.add_finding(scan_id, vuln)
+        events.publish('finding', vuln)
+    
     try:
         results = []
         
         # SQL Injection scan
         if scan_type in ['sqli', 'all']:
-            scan_status[scan_id].update({
-                'status': 'running',
-                'progress': 25,
-                'message': 'Running SQL Injection scan...'
-            })
+            update_status(scan_id, status='running', progress=25, message='Running SQL Injection scan...')
             
-            sqli_scanner = SQLInjectionScanner(url)
+            sqli_scanner = SQLInjectionScanner(url, client=client, surface=surface, points=points,
+                                               on_finding=on_finding)
             sqli_results = sqli_scanner.scan()
             results.extend(sqli_results)
         
         # XSS scan
         if scan_type in ['xss', 'all']:
-            scan_status[scan_id].update({
-                'status': 'running',
-                'progress': 60,
-                'message': 'Running XSS scan...'
-            })
+            update_status(scan_id, status='running', progress=60, message='Running XSS scan...')
             
-            xss_scanner = XSSScanner(url)
+            xss_scanner = XSSScanner(url, client=client, surface=surface, points=points,
+                                     on_finding=on_finding)
             xss_results = xss_scanner.scan()
             results.extend(xss_results)
         
-        # Store results
-        scan_results[scan_id] = {
-            'url': url,
-            'scan_type': scan_type,
-            'timestamp': datetime.now().isoformat(),
-            'vulnerabilities': results,
-            'total_vulnerabilities': len(results),
-            'high_severity': len([v for v in results if v.get('severity') == 'High']),
-            'medium_severity': len([v for v in results if v.get('severity') == 'Medium']),
-            'low_severity': len([v for v in results if v.get('severity') == 'Low'])
-        }
-        
-        # Update status
-        scan_status[scan_id].update({
-            'status': 'completed',
-            'progress': 100,
-            'message': f'Scan completed. Found {len(results)} vulnerability(ies).'
-        })
-        
+        # Update status (findings are already stored as they were reported)
+        update_status(scan_id, status='completed', progress=100,
+                      message=f'Scan completed. Found {len(results)} vulnerability(ies).')
+    
     except Exception as e:
-        scan_status[scan_id].update({
-            'status': 'error',
-            'progress': 0,
-            'message': f'Error: {str(e)}'
-        })
+        update_status(scan_id, status='error', progress=0, message=f'Error: {str(e)}')
+    finally:
+        client.close()
+        events.publish('end', {'scan_id': scan_id})
+        events.close()
 
 
 def start_gui():
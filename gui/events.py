@@ -0,0 +1,60 @@
+"""
+Server-Sent Events for the Web GUI
+Per-scan event log that streams progress and findings to any number of browsers
+"""
+
+import json
+import threading
+
+from config import SSE_KEEPALIVE_INTERVAL
+
+
+class ScanEvents:
+    """Append-only event log of one scan
+    
+    Events are numbered from 1 and kept for the life of the scan, so a
+    client that reconnects with Last-Event-ID receives exactly what it
+    missed. Publishing never blocks on slow clients; each client's stream
+    waits on a condition until there is something new.
+    """
+    
+    def __init__(self):
+        self._events = []
+        self._closed = False
+        self._cond = threading.Condition()
+    
+    def publish(self, event, data):
+        """Record an event (e.g. 'status' or 'finding') and wake the streams"""
+        with self._cond:
+            self._events.append((len(self._events) + 1, event, json.dumps(data, default=str)))
+            self._cond.notify_all()
+    
+    @property
+    def closed(self):
+        return self._closed
+    
+    def close(self):
+        """No more events; streams end once they have sent everything"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+    
+    def stream(self, last_id=0, keepalive=SSE_KEEPALIVE_INTERVAL):
+        """Yield SSE frames for events after last_id until the scan is over"""
+        position = max(0, last_id)
+        while True:
+            with self._cond:
+                if position >= len(self._events) and not self._closed:
+                    self._cond.wait(keepalive)
+                pending = self._events[position:]
+                closed = self._closed
+            
+            if pending:
+                for event_id, event, data in pending:
+                    yield f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+                position += len(pending)
+            elif closed:
+                return
+            else:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
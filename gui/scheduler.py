@@ -0,0 +1,71 @@
+"""
+Bounded scan scheduler for the Web GUI
+Fixed worker pool fed from a bounded priority queue
+"""
+
+import itertools
+import queue
+import threading
+import time
+
+from config import GUI_SCAN_WORKERS, GUI_SCAN_QUEUE_SIZE, GUI_RETRY_AFTER
+
+
+class ScanScheduler:
+    """Runs submitted scans on a fixed number of worker threads
+    
+    Waiting scans sit in a bounded priority queue (higher priority first,
+    then submission order). When the queue is full, submit() raises
+    queue.Full instead of starting another thread, and retry_after()
+    estimates how long until a slot frees up from recent scan durations.
+    """
+    
+    def __init__(self, workers=GUI_SCAN_WORKERS, queue_size=GUI_SCAN_QUEUE_SIZE):
+        self.workers = max(1, workers)
+        self._queue = queue.PriorityQueue(maxsize=max(1, queue_size))
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._average = None  # Moving average of scan duration in seconds
+    
+    def submit(self, job, *args, priority=0):
+        """Queue job(*args); raise queue.Full when the queue has no room"""
+        self._start()
+        self._queue.put_nowait((-priority, next(self._order), job, args))
+    
+    def pending(self):
+        """Number of scans waiting for a worker"""
+        return self._queue.qsize()
+    
+    def retry_after(self):
+        """Seconds a rejected client should wait before submitting again"""
+        with self._lock:
+            average = self._average
+        if average is None:
+            return GUI_RETRY_AFTER
+        # Roughly one queue slot frees up every average/workers seconds
+        return max(1, int(average / self.workers + 0.5))
+    
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'gui-scan-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+    
+    def _work(self):
+        while True:
+            _, _, job, args = self._queue.get()
+            started = time.monotonic()
+            try:
+                job(*args)
+            except Exception:
+                # Jobs report their own errors; a failed scan must not kill the worker
+                pass
+            finally:
+                duration = time.monotonic() - started
+                with self._lock:
+                    self._average = duration if self._average is None else 0.8 * self._average + 0.2 * duration
+                self._queue.task_done()
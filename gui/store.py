@@ -0,0 +1,180 @@
+"""
+Persistent scan store for the Web GUI
+SQLite tables for scans and findings with a bounded in-memory cache of hot scans
+"""
+
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from config import GUI_DB_FILE, GUI_CACHE_SIZE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    scan_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    scan_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    message TEXT,
+    created TEXT NOT NULL,
+    finished TEXT
+);
+CREATE INDEX IF NOT EXISTS scans_url ON scans (url, created);
+CREATE INDEX IF NOT EXISTS scans_created ON scans (created);
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    severity TEXT,
+    url TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS findings_scan ON findings (scan_id, id);
+CREATE INDEX IF NOT EXISTS findings_severity ON findings (scan_id, severity, id);
+CREATE INDEX IF NOT EXISTS findings_type ON findings (scan_id, type, id);
+CREATE INDEX IF NOT EXISTS findings_url ON findings (url);
+"""
+
+STATUS_FIELDS = ('status', 'progress', 'message')
+
+
+class ScanStore:
+    """Scans and their findings, kept in SQLite across restarts
+    
+    Status rows of recently used scans are cached in a bounded LRU, so the
+    status and event endpoints of running scans do not hit the database.
+    Findings are written as the scanners report them and read back a page
+    at a time through the indexes on scan ID, severity, type and URL.
+    Scans that were queued or running when the process stopped are marked
+    'interrupted' on start-up.
+    """
+    
+    def __init__(self, path=GUI_DB_FILE, cache_size=GUI_CACHE_SIZE):
+        self.path = path
+        self.cache_size = max(1, cache_size)
+        self._cache = OrderedDict()  # scan_id -> scan row dict
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.db.execute(
+            "UPDATE scans SET status = 'interrupted', message = 'Scan interrupted by a restart' "
+            "WHERE status IN ('queued', 'running')"
+        )
+    
+    def create(self, scan_id, url, scan_type):
+        scan = {
+            'scan_id': scan_id, 'url': url, 'scan_type': scan_type, 'status': 'queued',
+            'progress': 0, 'message': None, 'created': datetime.now().isoformat(), 'finished': None,
+        }
+        with self._lock:
+            self.db.execute(
+                "INSERT INTO scans (scan_id, url, scan_type, status, progress, message, created) "
+                "VALUES (:scan_id, :url, :scan_type, :status, :progress, :message, :created)",
+                scan
+            )
+            self._remember(scan)
+    
+    def delete(self, scan_id):
+        with self._lock:
+            self.db.execute("DELETE FROM findings WHERE scan_id = ?", (scan_id,))
+            self.db.execute("DELETE FROM scans WHERE scan_id = ?", (scan_id,))
+            self._cache.pop(scan_id, None)
+    
+    def update_status(self, scan_id, **fields):
+        """Update status, progress and/or message; return the scan's status dict"""
+        fields = {name: value for name, value in fields.items() if name in STATUS_FIELDS}
+        if fields.get('status') in ('completed', 'error'):
+            fields['finished'] = datetime.now().isoformat()
+        with self._lock:
+            assignments = ', '.join(f"{name} = :{name}" for name in fields)
+            self.db.execute(f"UPDATE scans SET {assignments} WHERE scan_id = :scan_id", dict(fields, scan_id=scan_id))
+            scan = self._get(scan_id)
+            if scan is not None:
+                scan.update(fields)
+        return self.status(scan_id)
+    
+    def scan(self, scan_id):
+        """The scan's row as a dict, or None"""
+        with self._lock:
+            scan = self._get(scan_id)
+            return dict(scan) if scan is not None else None
+    
+    def status(self, scan_id):
+        """{'status', 'progress', 'message'} in the layout of the status endpoint, or None"""
+        scan = self.scan(scan_id)
+        if scan is None:
+            return None
+        return {name: scan[name] for name in STATUS_FIELDS}
+    
+    def _get(self, scan_id):
+        """Cached scan row, loading it on a miss (lock held)"""
+        scan = self._cache.get(scan_id)
+        if scan is not None:
+            self._cache.move_to_end(scan_id)
+            return scan
+        row = self.db.execute("SELECT * FROM scans WHERE scan_id = ?", (scan_id,)).fetchone()
+        if row is None:
+            return None
+        return self._remember(dict(row))
+    
+    def _remember(self, scan):
+        """Put a scan row in the LRU cache (lock held)"""
+        self._cache[scan['scan_id']] = scan
+        self._cache.move_to_end(scan['scan_id'])
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return scan
+    
+    def add_finding(self, scan_id, vuln):
+        with self._lock:
+            self.db.execute(
+                "INSERT INTO findings (scan_id, type, severity, url, data) VALUES (?, ?, ?, ?, ?)",
+                (scan_id, vuln.get('type'), vuln.get('severity'), vuln.get('url'), json.dumps(vuln, default=str))
+            )
+    
+    def severity_counts(self, scan_id):
+        """{severity: number of findings} for a scan"""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT severity, COUNT(*) FROM findings WHERE scan_id = ? GROUP BY severity", (scan_id,)
+            ).fetchall()
+        return {severity: count for severity, count in rows}
+    
+    def findings(self, scan_id, severity=None, vuln_type=None, url=None, offset=0, limit=None):
+        """(total matching, page of findings) for a scan, oldest first"""
+        where = ["scan_id = ?"]
+        params = [scan_id]
+        for column, value in (('severity', severity), ('type', vuln_type), ('url', url)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        condition = ' AND '.join(where)
+        with self._lock:
+            total = self.db.execute(f"SELECT COUNT(*) FROM findings WHERE {condition}", params).fetchone()[0]
+            rows = self.db.execute(
+                f"SELECT data FROM findings WHERE {condition} ORDER BY id LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset]
+            ).fetchall()
+        return total, [json.loads(row[0]) for row in rows]
+    
+    def scans(self, url=None, status=None, offset=0, limit=50):
+        """(total matching, page of scan rows), newest first"""
+        where = []
+        params = []
+        for column, value in (('url', url), ('status', status)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        condition = f"WHERE {' AND '.join(where)}" if where else ''
+        with self._lock:
+            total = self.db.execute(f"SELECT COUNT(*) FROM scans {condition}", params).fetchone()[0]
+            rows = self.db.execute(
+                f"SELECT * FROM scans {condition} ORDER BY created DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return total, [dict(row) for row in rows]
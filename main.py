@@ -6,11 +6,17 @@ Main entry point for the application
 
 import sys
 import argparse
+import itertools
+import re
 from colorama import init, Fore, Style
 
 # Initialize colorama for Windows
 init(autoreset=True)
 
+# Command-line options saved in a scan checkpoint
+SCAN_OPTIONS = ('url', 'type', 'output', 'max_rps', 'crawl', 'max_depth', 'max_pages',
+                'include', 'exclude', 'all_pages', 'incremental')
+
 def print_banner():
     """Display application banner"""
     banner = f"""
@@ -26,6 +32,228 @@ def print_banner():
     """
     print(banner)
 
+def scan_target(args, target, template, client, surface, points, checkpoint):
+    """Run the selected scanners on one page and return its findings tagged with its template"""
+    from scanners.sql_injection import SQLInjectionScanner
+    from scanners.xss_scanner import XSSScanner
+    
+    def on_finding(vuln):
+        vuln['template'] = template
+        if checkpoint is not None:
+            checkpoint.record('finding', finding=vuln)
+    
+    results = []
+    if args.type in ['sqli', 'all']:
+        print(f"{Fore.CYAN}[*] Running SQL Injection scan...{Style.RESET_ALL}")
+        sqli_scanner = SQLInjectionScanner(target, client=client, surface=surface, points=points,
+                                           on_finding=on_finding)
+        results.extend(sqli_scanner.scan())
+    
+    if args.type in ['xss', 'all']:
+        print(f"{Fore.CYAN}[*] Running XSS scan...{Style.RESET_ALL}")
+        xss_scanner = XSSScanner(target, client=client, surface=surface, points=points,
+                                 on_finding=on_finding)
+        results.extend(xss_scanner.scan())
+    return results
+
+def carry_findings(findings, template, checkpoint):
+    """Findings of an unchanged page from the previous run, tagged with its current template"""
+    carried = []
+    for vuln in findings:
+        vuln = dict(vuln, template=template)
+        if checkpoint is not None:
+            checkpoint.record('finding', finding=vuln)
+        carried.append(vuln)
+    return carried
+
+def scan_site(args, client, checkpoint=None, state=None, fingerprints=None):
+    """Crawl (optionally) and scan one target URL; return its findings
+    
+    checkpoint/state record and resume progress, fingerprints enables
+    incremental rescans. The caller owns the client and saves fingerprints.
+    """
+    from utils.attack_surface import AttackSurface
+    from utils.injection_points import InjectionPointRegistry
+    from utils.endpoint_clusters import EndpointClusters
+    
+    results = []
+    
+    # Pages are parsed once and their forms shared by both scanners
+    surface = AttackSurface(client)
+    points = InjectionPointRegistry(checkpoint)
+    
+    if args.crawl:
+        import config
+        from utils.crawler import Crawler
+        crawler = Crawler(
+            client, surface,
+            include=args.include,
+            exclude=config.CRAWL_EXCLUDE + (args.exclude or []),
+            max_depth=args.max_depth if args.max_depth is not None else config.CRAWL_MAX_DEPTH,
+            max_pages=args.max_pages if args.max_pages is not None else config.CRAWL_MAX_PAGES
+        )
+        print(f"{Fore.CYAN}[*] Crawling from {args.url}...{Style.RESET_ALL}")
+        targets = crawler.crawl(args.url)
+    else:
+        targets = [args.url]
+    
+    # Crawled pages of one endpoint template (e.g. /post/<id>) are only scanned a few times
+    clusters = EndpointClusters() if args.crawl and not args.all_pages else None
+    
+    # Targets already handled in an earlier run of this scan
+    handled = set()
+    if state is not None:
+        for url, page in state.pages.items():
+            surface.restore(url, page)
+        points.restore(state.finished)
+        results.extend(state.findings)
+        for target in state.done:
+            handled.add(target)
+            if clusters is not None:
+                clusters.admit(target, surface.page(target))
+        print(f"{Fore.CYAN}[*] Resuming {checkpoint.scan_id}: {len(handled)} page(s) done, "
+              f"{len(state.pending)} pending, {len(state.findings)} finding(s) so far{Style.RESET_ALL}")
+        if state.complete:
+            targets = []
+        elif args.crawl:
+            # Pages found but not finished go first; the crawl then continues past them
+            targets = itertools.chain(state.pending, targets)
+        else:
+            targets = state.pending + targets
+    
+    # Pages become queued jobs instead of being scanned here
+    coordinator = None
+    if args.coordinator:
+        from utils.work_queue import WorkQueue
+        from utils.distributed import Coordinator, start_workers
+        coordinator = Coordinator(WorkQueue(args.coordinator), points, args.type)
+        local_workers = start_workers(args.coordinator, args.processes or 0)
+        print(f"{Fore.CYAN}[*] Coordinating work queue {args.coordinator} ({len(local_workers)} local worker(s)){Style.RESET_ALL}")
+    
+    # Pages are scanned as soon as the crawler finds them
+    scanned = 0
+    unchanged = 0
+    try:
+        for target in targets:
+            if target in handled:
+                continue
+            handled.add(target)
+            page = surface.page(target)
+            if checkpoint is not None and (state is None or target not in state.pages):
+                checkpoint.record('page', url=target, surface=page)
+            
+            template = None
+            representative = True
+            if clusters is not None:
+                template, representative = clusters.admit(target, page)
+            if representative and coordinator is not None:
+                scanned += 1
+                queued = coordinator.enqueue(target, page, template)
+                print(f"{Fore.CYAN}[*] Queued {queued} job(s) for {target}{Style.RESET_ALL}")
+            elif representative:
+                # Pages unchanged since the last run keep their findings without being retested
+                carried, fingerprint = None, None
+                if fingerprints is not None:
+                    carried, fingerprint = fingerprints.check(client, surface, target, args.type)
+                if carried is not None:
+                    unchanged += 1
+                    print(f"{Fore.CYAN}[*] Unchanged since last scan, {len(carried)} finding(s) carried over: {target}{Style.RESET_ALL}")
+                    found = carry_findings(carried, template, checkpoint)
+                else:
+                    scanned += 1
+                    if args.crawl:
+                        print(f"\n{Fore.YELLOW}[*] Scanning discovered page: {target}{Style.RESET_ALL}")
+                    found = scan_target(args, target, template, client, surface, points, checkpoint)
+                if fingerprints is not None:
+                    fingerprints.update(target, fingerprint, args.type, found)
+                results.extend(found)
+            if checkpoint is not None:
+                checkpoint.record('target', url=target)
+        
+        if checkpoint is not None:
+            checkpoint.record('end')
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+    
+    if coordinator is not None:
+        # Findings are merged centrally once every job is done
+        counts = coordinator.wait()
+        results.extend(coordinator.findings())
+        coordinator.queue.close()
+        for worker in local_workers:
+            worker.join()
+        print(f"{Fore.GREEN}[*] {counts['done']} job(s) done, {counts['failed']} failed, "
+              f"{len(results)} finding(s) reported{Style.RESET_ALL}")
+    
+    if args.crawl:
+        print(f"{Fore.GREEN}[*] Crawled {crawler.pages} page(s), scanned {scanned}{Style.RESET_ALL}")
+    if unchanged:
+        print(f"{Fore.GREEN}[*] {unchanged} unchanged page(s) not retested{Style.RESET_ALL}")
+    if clusters is not None:
+        for template, count in clusters.skipped().items():
+            print(f"{Fore.CYAN}[*] Skipped {count} more page(s) of template {template}{Style.RESET_ALL}")
+        results = EndpointClusters.merge(results)
+    
+    return results
+
+def run_batch(args):
+    """Scan every target of an -iL list, a few at a time with per-host fairness"""
+    import config
+    from utils.batch_scheduler import HostRoundRobin, read_targets
+    from utils.checkpoint import Checkpoint
+    from utils.report_generator import ReportGenerator
+    from utils.http_client import HTTPClient
+    from utils.fingerprints import EndpointFingerprints
+    
+    targets = read_targets(args.input_list)
+    scheduler = HostRoundRobin(targets)
+    concurrency = args.concurrency or config.BATCH_CONCURRENCY
+    print(f"{Fore.GREEN}[*] {len(targets)} target(s) on {scheduler.hosts} host(s), "
+          f"{concurrency} at a time{Style.RESET_ALL}")
+    print(f"{Fore.GREEN}[*] Scan Type: {args.type.upper()}{Style.RESET_ALL}\n")
+    
+    # One client for all targets: its per-host limiter keeps each host to its own connections
+    client = HTTPClient(max_rps=args.max_rps)
+    fingerprints = EndpointFingerprints() if args.incremental else None
+    
+    def scan_one(index, url):
+        target_args = argparse.Namespace(**dict(vars(args), url=url))
+        checkpoint = None
+        if not args.no_checkpoint:
+            checkpoint = Checkpoint.create()
+            checkpoint.record('scan', options={name: getattr(target_args, name) for name in SCAN_OPTIONS})
+        print(f"{Fore.YELLOW}[*] Starting target {index + 1}/{len(targets)}: {url}{Style.RESET_ALL}")
+        results = scan_site(target_args, client, checkpoint, None, fingerprints)
+        name = f"{args.output}_{index + 1:03d}_{re.sub(r'[^A-Za-z0-9]+', '_', url.split('://', 1)[-1]).strip('_')[:60]}"
+        ReportGenerator().generate(results, name)
+        return name, results
+    
+    try:
+        outcomes = scheduler.run(scan_one, concurrency)
+    finally:
+        if fingerprints is not None:
+            fingerprints.save()
+        client.close()
+    
+    # Combined summary: one line per target plus a report of every finding
+    combined = []
+    print(f"\n{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}Batch Scan Summary{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
+    for url, outcome, error in outcomes:
+        if error is not None:
+            print(f"{Fore.RED}[!] {url}: failed ({str(error)}){Style.RESET_ALL}")
+            continue
+        name, results = outcome
+        combined.extend(results)
+        color = Fore.RED if results else Fore.GREEN
+        print(f"{color}[{len(results)}] {url} -> {name}.html{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}\n")
+    
+    ReportGenerator().generate(combined, f"{args.output}_summary")
+    print(f"{Fore.GREEN}[✓] Batch completed! {len(combined)} finding(s), combined report: {args.output}_summary.html{Style.RESET_ALL}")
+
 def main():
     """Main application entry point"""
     print_banner()
@@ -39,6 +267,14 @@ def main():
                         help='Target URL to scan',
                         required=False)
     
+    parser.add_argument('-iL', '--input-list',
+                        metavar='FILE',
+                        help='File with one target URL per line, or - for stdin')
+    
+    parser.add_argument('--concurrency',
+                        type=int,
+                        help='Targets scanned at the same time with -iL (default: config.BATCH_CONCURRENCY)')
+    
     parser.add_argument('-t', '--type',
                         choices=['sqli', 'xss', 'all'],
                         default='all',
@@ -48,6 +284,62 @@ def main():
                         help='Output file for report',
                         default='report')
     
+    parser.add_argument('--max-rps',
+                        type=float,
+                        help='Maximum requests per second per host (default: config.MAX_RPS)')
+    
+    parser.add_argument('--warm-up',
+                        action='store_true',
+                        help='Open pooled connections to the target before scanning')
+    
+    parser.add_argument('--crawl',
+                        action='store_true',
+                        help='Crawl from the target URL and scan every page with parameters or forms')
+    
+    parser.add_argument('--max-depth',
+                        type=int,
+                        help='Maximum crawl link depth (default: config.CRAWL_MAX_DEPTH)')
+    
+    parser.add_argument('--max-pages',
+                        type=int,
+                        help='Maximum pages fetched while crawling (default: config.CRAWL_MAX_PAGES)')
+    
+    parser.add_argument('--include',
+                        action='append',
+                        help='Regex of URLs to crawl (repeatable; default: the target host)')
+    
+    parser.add_argument('--exclude',
+                        action='append',
+                        help='Regex of URLs never to crawl (repeatable, added to config.CRAWL_EXCLUDE)')
+    
+    parser.add_argument('--all-pages',
+                        action='store_true',
+                        help='Scan every crawled page instead of a few per endpoint template')
+    
+    parser.add_argument('--incremental',
+                        action='store_true',
+                        help='Only retest pages that changed since the last incremental scan (config.FINGERPRINT_FILE)')
+    
+    parser.add_argument('--resume',
+                        metavar='SCAN',
+                        help='Resume an interrupted scan from its checkpoint (scan ID or file path)')
+    
+    parser.add_argument('--no-checkpoint',
+                        action='store_true',
+                        help='Do not write a resumable checkpoint for this scan')
+    
+    parser.add_argument('--coordinator',
+                        metavar='QUEUE',
+                        help='Queue injection-point jobs in a SQLite work queue for --worker processes')
+    
+    parser.add_argument('--worker',
+                        metavar='QUEUE',
+                        help='Run jobs from a coordinator\'s work queue until it is finished')
+    
+    parser.add_argument('--processes',
+                        type=int,
+                        help='Local worker processes to start (default: 1 with --worker, 0 with --coordinator)')
+    
     parser.add_argument('--gui',
                         action='store_true',
                         help='Launch web-based GUI interface')
@@ -58,29 +350,58 @@ def main():
         print(f"{Fore.GREEN}[*] Starting Web GUI interface...{Style.RESET_ALL}")
         from gui.app import start_gui
         start_gui()
-    elif args.url:
+    elif args.worker:
+        from utils.distributed import run_workers
+        run_workers(args.worker, args.processes or 1)
+    elif args.input_list:
+        if args.resume or args.coordinator:
+            parser.error('-iL cannot be combined with --resume or --coordinator')
+        run_batch(args)
+    elif args.url or args.resume:
+        from utils.checkpoint import Checkpoint
+        
+        if args.coordinator and (args.resume or args.incremental):
+            parser.error('--coordinator cannot be combined with --resume or --incremental')
+        
+        # Options that define a scan are saved in its checkpoint and restored on resume
+        state = None
+        checkpoint = None
+        if args.resume:
+            checkpoint = Checkpoint.find(args.resume)
+            state = checkpoint.load()
+            for name, value in state.options.items():
+                setattr(args, name, value)
+        elif not args.no_checkpoint and not args.coordinator:
+            # A coordinator's work queue is durable already
+            checkpoint = Checkpoint.create()
+            checkpoint.record('scan', options={name: getattr(args, name) for name in SCAN_OPTIONS})
+        
         print(f"{Fore.GREEN}[*] Target URL: {args.url}{Style.RESET_ALL}")
         print(f"{Fore.GREEN}[*] Scan Type: {args.type.upper()}{Style.RESET_ALL}")
+        if checkpoint is not None:
+            print(f"{Fore.GREEN}[*] Checkpoint: {checkpoint.path} (resume with --resume {checkpoint.scan_id}){Style.RESET_ALL}")
         print(f"{Fore.YELLOW}[*] Starting scan...{Style.RESET_ALL}\n")
         
         # Import scanners
-        from scanners.sql_injection import SQLInjectionScanner
-        from scanners.xss_scanner import XSSScanner
         from utils.report_generator import ReportGenerator
+        from utils.http_client import HTTPClient
+        from utils.fingerprints import EndpointFingerprints
         
-        results = []
+        # One client (and connection pool) shared by every scanner in the run
+        client = HTTPClient(max_rps=args.max_rps)
+        if args.warm_up:
+            opened = client.warm_up(args.url)
+            print(f"{Fore.GREEN}[*] Warmed up {opened} connection(s){Style.RESET_ALL}")
         
-        if args.type in ['sqli', 'all']:
-            print(f"{Fore.CYAN}[*] Running SQL Injection scan...{Style.RESET_ALL}")
-            sqli_scanner = SQLInjectionScanner(args.url)
-            sqli_results = sqli_scanner.scan()
-            results.extend(sqli_results)
+        # Fingerprints and findings of the previous run, for incremental rescans
+        fingerprints = EndpointFingerprints() if args.incremental else None
+        try:
+            results = scan_site(args, client, checkpoint, state, fingerprints)
+        finally:
+            if fingerprints is not None:
+                fingerprints.save()
         
-        if args.type in ['xss', 'all']:
-            print(f"{Fore.CYAN}[*] Running XSS scan...{Style.RESET_ALL}")
-            xss_scanner = XSSScanner(args.url)
-            xss_results = xss_scanner.scan()
-            results.extend(xss_results)
+        client.close()
         
         # Generate report
         print(f"\n{Fore.GREEN}[*] Generating report...{Style.RESET_ALL}")
@@ -93,6 +414,12 @@ def main():
         print(f"\n{Fore.YELLOW}Examples:{Style.RESET_ALL}")
         print(f"  python main.py -u http://example.com -t all")
         print(f"  python main.py -u http://example.com -t sqli -o sqli_report")
+        print(f"  python main.py -u http://example.com --crawl --max-depth 2")
+        print(f"  python main.py -u http://example.com --crawl --incremental")
+        print(f"  python main.py -iL targets.txt --concurrency 8")
+        print(f"  python main.py --resume scan_20240101_120000")
+        print(f"  python main.py -u http://example.com --crawl --coordinator queue.db --processes 4")
+        print(f"  python main.py --worker queue.db")
         print(f"  python main.py --gui")
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+"""
+Persisted payload hit statistics and learned payload ordering
+"""
+
+import json
+import math
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from config import PAYLOAD_STATS_FILE, PAYLOAD_STATS_MIN_SAMPLES, LEARNED_PAYLOAD_ORDER
+
+# Weight of the exploration bonus in the UCB score
+EXPLORATION = 0.1
+
+
+@contextmanager
+def _process_lock(path):
+    """Hold an exclusive OS lock on path (created if missing), shared by all processes"""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class PayloadStats:
+    """Per-payload success rates, global and per technology fingerprint
+    
+    Counts are kept as {technique: {payload: [attempts, hits]}} both globally
+    and per fingerprint. order() ranks payloads with a UCB1-style bandit
+    score so payloads that fire often in this environment are sent first,
+    while rarely tried ones still get explored. Ties keep the original list
+    order, so with no history the order is unchanged.
+    """
+    
+    _file_lock = threading.Lock()
+    
+    def __init__(self, path=PAYLOAD_STATS_FILE, enabled=LEARNED_PAYLOAD_ORDER):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.data = self._load()
+        self._delta = {'global': {}, 'fingerprints': {}}
+    
+    def _load(self):
+        """Read the stats file, or start empty"""
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                data.setdefault('global', {})
+                data.setdefault('fingerprints', {})
+                return data
+            except (OSError, ValueError):
+                pass
+        return {'global': {}, 'fingerprints': {}}
+    
+    @staticmethod
+    def fingerprint(response):
+        """Technology fingerprint from the Server and X-Powered-By headers"""
+        if response is None:
+            return None
+        parts = [response.headers.get(h, '') for h in ('Server', 'X-Powered-By')]
+        parts = [p.split()[0].lower() for p in parts if p.strip()]
+        return '|'.join(parts) or None
+    
+    def _counts(self, technique, fingerprint):
+        """Counts to rank with: the fingerprint's if it has enough samples, else global"""
+        if fingerprint:
+            table = self.data['fingerprints'].get(fingerprint, {}).get(technique, {})
+            if sum(c[0] for c in table.values()) >= PAYLOAD_STATS_MIN_SAMPLES:
+                return table
+        return self.data['global'].get(technique, {})
+    
+    def order(self, technique, payloads, fingerprint=None):
+        """Return payloads ranked by learned success rate (stable for ties)"""
+        payloads = list(payloads)
+        if not self.enabled:
+            return payloads
+        
+        with self._lock:
+            table = self._counts(technique, fingerprint)
+            if not table:
+                return payloads
+            total = sum(c[0] for c in table.values()) + 1
+            
+            def score(item):
+                index, payload = item
+                attempts, hits = table.get(payload, (0, 0))
+                # Beta(1, 1) prior mean plus exploration bonus
+                mean = (hits + 1) / (attempts + 2)
+                bonus = EXPLORATION * math.sqrt(math.log(total) / (attempts + 1))
+                return (-(mean + bonus), index)
+            
+            return [payload for _, payload in sorted(enumerate(payloads), key=score)]
+    
+    def record(self, technique, attempted, hit_payload=None, fingerprint=None):
+        """Record that the attempted payloads were sent and which one (if any) hit"""
+        if not self.enabled:
+            return
+        with self._lock:
+            for payload in attempted:
+                hit = 1 if payload == hit_payload else 0
+                self._add(self.data['global'], technique, payload, hit)
+                self._add(self._delta['global'], technique, payload, hit)
+                if fingerprint:
+                    self._add(self.data['fingerprints'].setdefault(fingerprint, {}),
+                              technique, payload, hit)
+                    self._add(self._delta['fingerprints'].setdefault(fingerprint, {}),
+                              technique, payload, hit)
+    
+    @staticmethod
+    def _add(tables, technique, payload, hit):
+        counts = tables.setdefault(technique, {}).setdefault(payload, [0, 0])
+        counts[0] += 1
+        counts[1] += hit
+    
+    def record_first_hit(self, technique, payloads, hit_payload, fingerprint=None):
+        """Record a first-hit run: everything up to the hit was attempted"""
+        payloads = list(payloads)
+        if hit_payload is not None and hit_payload in payloads:
+            payloads = payloads[:payloads.index(hit_payload) + 1]
+        self.record(technique, payloads, hit_payload, fingerprint)
+    
+    def save(self):
+        """Merge this run's counts into the stats file
+        
+        Only the counts recorded since the last save are added, and the
+        read-merge-replace runs under a lock file (thread lock plus an OS
+        file lock), so concurrent scans and worker processes writing the
+        same file do not overwrite each other.
+        """
+        if not self.enabled or not self.path:
+            return
+        with self._lock:
+            delta = self._delta
+            self._delta = {'global': {}, 'fingerprints': {}}
+        if not delta['global']:
+            return
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        with PayloadStats._file_lock, _process_lock(f"{self.path}.lock"):
+            on_disk = self._load()
+            self._merge(on_disk['global'], delta['global'])
+            for fingerprint, tables in delta['fingerprints'].items():
+                self._merge(on_disk['fingerprints'].setdefault(fingerprint, {}), tables)
+            
+            # Per-process temporary file, so a crashed writer never leaves a half file behind for others
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(on_disk, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+    
+    @staticmethod
+    def _merge(target, delta):
+        for technique, payloads in delta.items():
+            table = target.setdefault(technique, {})
+            for payload, (attempts, hits) in payloads.items():
+                counts = table.setdefault(payload, [0, 0])
+                counts[0] += attempts
+                counts[1] += hits
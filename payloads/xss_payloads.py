@@ -132,8 +132,8 @@ class XSSPayloads:
     
     @classmethod
     def get_all_payloads(cls):
-        """Get all XSS payloads"""
-        return (
+        """Get all XSS payloads (de-duplicated, first occurrence kept)"""
+        return list(dict.fromkeys(
             cls.BASIC_XSS +
             cls.EVENT_HANDLER_XSS +
             cls.SCRIPT_BASED_XSS +
@@ -142,12 +142,12 @@ class XSSPayloads:
             cls.JS_CONTEXT_XSS +
             cls.HTML_CONTEXT_XSS +
             cls.POLYGLOT_XSS
-        )
+        ))
     
     @classmethod
     def get_basic_payloads(cls):
         """Get basic XSS payloads for quick scan"""
-        return cls.BASIC_XSS + cls.EVENT_HANDLER_XSS[:5]
+        return list(dict.fromkeys(cls.BASIC_XSS + cls.EVENT_HANDLER_XSS[:5]))
     
     @classmethod
     def generate_unique_payload(cls, payload_type="basic"):
@@ -163,6 +163,11 @@ class XSSPayloads:
         else:
             return f"<script>alert('{unique_id}')</script>", unique_id
     
+    @classmethod
+    def generate_canary(cls):
+        """Generate a harmless alphanumeric marker for reflection discovery"""
+        return f"xss{uuid.uuid4().hex[:10]}"
+    
     # XSS detection patterns in response
     XSS_DETECTION_PATTERNS = [
         r"<script[^>]*>.*?alert.*?</script>",
@@ -0,0 +1,90 @@
+"""
+Multi-pattern signature matching over raw response bytes
+"""
+
+import re
+
+from payloads.sql_payloads import SQLPayloads
+
+# Bytes kept between streamed chunks when a matcher has regex patterns
+REGEX_OVERLAP = 64
+
+# Indicators of a successful UNION injection
+UNION_LITERALS = [
+    ('information_schema', None),
+    ('mysql', 'MySQL'),
+    ('postgres', 'PostgreSQL'),
+    ('mssql', 'Microsoft SQL Server'),
+]
+UNION_REGEXES = [
+    ('version number', rb'\d+\.\d+\.\d+', None),
+    ('uuid', rb'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', None),
+]
+
+
+class SignatureMatcher:
+    """Case-insensitive multi-pattern matcher over raw response bytes
+    
+    The body is lower-cased once as bytes (no charset detection or decoding).
+    Literals that contain a shorter literal (e.g. "ORA-01" and "ORA-") are
+    redundant for deciding whether anything matched, so only the minimal set
+    is compiled into one alternation and the body is scanned once; the most
+    specific label is resolved only after a hit. Regex patterns are compiled
+    into a second alternation.
+    """
+    
+    def __init__(self, literals=(), regexes=()):
+        """literals: (text, dbms) pairs; regexes: (label, regex bytes, dbms) triples"""
+        self.literals = []
+        self._dbms = {}
+        for text, dbms in literals:
+            key = text.lower().encode('utf-8')
+            if key not in self._dbms:
+                self.literals.append((text, key))
+                self._dbms[key] = dbms
+        keys = [key for _, key in self.literals]
+        minimal = [k for k in keys if not any(o != k and o in k for o in keys)]
+        self._literal = re.compile(b'|'.join(re.escape(k) for k in minimal)) if minimal else None
+        
+        self.regexes = list(regexes)
+        self._regex = None
+        if self.regexes:
+            alternatives = [b'(?P<r%d>%s)' % (i, regex) for i, (_, regex, _) in enumerate(self.regexes)]
+            self._regex = re.compile(b'|'.join(alternatives))
+        
+        longest = max((len(k) for k in keys), default=1)
+        self.overlap = max(longest - 1, REGEX_OVERLAP if self.regexes else 0)
+    
+    @classmethod
+    def from_signatures(cls, signatures, dbms_map=None):
+        """Build a matcher for literal signature strings"""
+        dbms_map = dbms_map or {}
+        return cls(literals=[(s, dbms_map.get(s)) for s in signatures])
+    
+    def search(self, content):
+        """Return (label, dbms) for a match in content, or None
+        
+        For literals the longest (most specific) matching signature is
+        reported.
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8', 'replace')
+        lowered = content.lower()
+        
+        if self._literal is not None and self._literal.search(lowered):
+            text, key = max(((t, k) for t, k in self.literals if k in lowered),
+                            key=lambda item: len(item[1]))
+            return text, self._dbms[key]
+        
+        if self._regex is not None:
+            match = self._regex.search(lowered)
+            if match is not None:
+                label, _, dbms = self.regexes[int(match.lastgroup[1:])]
+                return label, dbms
+        return None
+
+
+# Shared matchers, built once when the module loads
+SQL_ERROR_MATCHER = SignatureMatcher.from_signatures(SQLPayloads.ERROR_SIGNATURES,
+                                                     SQLPayloads.ERROR_SIGNATURE_DBMS)
+UNION_SUCCESS_MATCHER = SignatureMatcher(literals=UNION_LITERALS, regexes=UNION_REGEXES)
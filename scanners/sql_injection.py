@@ -3,346 +3,441 @@ SQL Injection Scanner Module
 Automatically detects SQL injection vulnerabilities in web applications
 """
 
-import time
-import re
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-from bs4 import BeautifulSoup
+from urllib.parse import urlencode
 from colorama import Fore, Style
 
 from utils.http_client import HTTPClient
+from utils.attack_surface import AttackSurface
+from utils.injection_points import InjectionPointRegistry, send_values
+from utils.fanout import PayloadFanout
+from utils.batch_probe import BatchProber
+from utils.stream_detector import MatcherDetector
+from scanners.time_based import TimeBasedEngine, TimeBasedScheduler
+from scanners.signature_matcher import SQL_ERROR_MATCHER, UNION_SUCCESS_MATCHER
 from payloads.sql_payloads import SQLPayloads
-from config import SQLI_DETECTION_TIMEOUT, SQLI_MAX_PAYLOADS
+from payloads.payload_stats import PayloadStats
+from payloads.registry import PayloadRegistry
+from config import SQLI_MAX_PAYLOADS, BATCH_PROBE_MIN_PARAMETERS
 
 
 class SQLInjectionScanner:
     """SQL Injection vulnerability scanner"""
     
-    def __init__(self, url):
+    def __init__(self, url, client=None, stats=None, surface=None, points=None, on_finding=None):
         self.url = url
-        self.client = HTTPClient()
+        self.client = client or HTTPClient()
+        self.surface = surface or AttackSurface(self.client)
+        self.points = points if points is not None else InjectionPointRegistry()
+        self.stats = stats or PayloadStats()
+        self.payloads = PayloadRegistry.default()
+        self.fingerprint = None
+        self.fanout = PayloadFanout(self.client.workers)
+        self.time_engine = TimeBasedEngine()
+        self._time_jobs = []  # (injection point, payload limit) in queueing order
         self.vulnerabilities = []
-        self.tested_params = set()
+        self.on_finding = on_finding  # Called with each finding as it is reported
     
     def scan(self):
         """Main scan function"""
         print(f"{Fore.CYAN}[*] Starting SQL Injection scan on: {self.url}{Style.RESET_ALL}")
         
+        # Technology fingerprint used to pick learned payload ordering
+        self.fingerprint = PayloadStats.fingerprint(self.client.get(self.url, cache=True))
+        
         # Get parameters from URL
-        params = self._get_url_parameters()
+        points = self.points.from_url(self.url)
         
         # Scan GET parameters
-        if params:
-            print(f"{Fore.YELLOW}[*] Testing GET parameters: {list(params.keys())}{Style.RESET_ALL}")
-            self._scan_get_parameters(params)
+        if points:
+            print(f"{Fore.YELLOW}[*] Testing GET parameters: {[point.name for point in points]}{Style.RESET_ALL}")
+            self._scan_get_parameters(points)
         
-        # Scan POST forms
-        forms = self._get_forms()
+        # Scan forms
+        forms = self.surface.forms(self.url)
         if forms:
-            print(f"{Fore.YELLOW}[*] Found {len(forms)} form(s), testing POST parameters...{Style.RESET_ALL}")
+            print(f"{Fore.YELLOW}[*] Found {len(forms)} form(s), testing form parameters...{Style.RESET_ALL}")
             for form in forms:
-                self._scan_post_form(form)
+                self._scan_form(form)
+        
+        # Wait for the overlapped time-based tests
+        self._collect_time_based()
+        self.stats.save()
         
         # Print summary
         self._print_summary()
         
         return self.vulnerabilities
     
-    def _get_url_parameters(self):
-        """Extract parameters from URL"""
-        parsed = urlparse(self.url)
-        params = parse_qs(parsed.query)
-        # Convert lists to single values
-        return {k: v[0] if isinstance(v, list) else v for k, v in params.items()}
-    
-    def _get_forms(self):
-        """Extract forms from the webpage"""
-        try:
-            response = self.client.get(self.url)
-            if not response:
-                return []
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            forms = soup.find_all('form')
-            
-            form_details = []
-            for form in forms:
-                action = form.get('action', '')
-                method = form.get('method', 'get').lower()
-                inputs = []
-                
-                for input_tag in form.find_all(['input', 'textarea', 'select']):
-                    input_type = input_tag.get('type', 'text')
-                    input_name = input_tag.get('name')
-                    if input_name:
-                        inputs.append({
-                            'type': input_type,
-                            'name': input_name
-                        })
-                
-                if inputs:
-                    form_details.append({
-                        'action': action,
-                        'method': method,
-                        'inputs': inputs
-                    })
-            
-            return form_details
-        except Exception as e:
-            print(f"{Fore.RED}[!] Error parsing forms: {str(e)}{Style.RESET_ALL}")
-            return []
-    
-    def _scan_get_parameters(self, params):
+    def _scan_get_parameters(self, points):
         """Scan GET parameters for SQL injection"""
-        for param_name, param_value in params.items():
-            if param_name in self.tested_params:
-                continue
-            
-            self.tested_params.add(param_name)
-            print(f"{Fore.CYAN}  [*] Testing parameter: {param_name}{Style.RESET_ALL}")
+        points = [point for point in points if self.points.claim(point, 'sqli')]
+        error_hits, boolean_hits = self._discover(points, boolean=True)
+        
+        for point in points:
+            print(f"{Fore.CYAN}  [*] Testing parameter: {point.name}{Style.RESET_ALL}")
             
             # Test error-based SQL injection
-            if self._test_error_based(param_name, param_value, params):
+            if error_hits.get(point.name, False) is not False:
+                self._report_quote_error(point, error_hits[point.name])
+                continue
+            if self._test_error_based(point, 15, skip_quote=point.name in error_hits):
                 continue
             
             # Test union-based SQL injection
-            if self._test_union_based(param_name, param_value, params):
+            if self._test_union_based(point):
                 continue
             
             # Test boolean-based SQL injection
-            if self._test_boolean_based(param_name, param_value, params):
+            if point.name not in boolean_hits:
+                if self._test_boolean_based(point):
+                    continue
+            elif boolean_hits[point.name] is not False:
+                self._report_boolean(point, boolean_hits[point.name])
                 continue
             
-            # Test time-based SQL injection
-            if self._test_time_based(param_name, param_value, params):
-                continue
+            # Queue time-based SQL injection (runs after the other techniques, overlapped across injection points)
+            self._queue_time_based(point, 5)
+        
+        self._finish(points)
     
-    def _scan_post_form(self, form):
-        """Scan POST form for SQL injection"""
-        action = form['action']
-        method = form['method']
-        inputs = form['inputs']
-        
-        # Build form URL
-        if action.startswith('http'):
-            form_url = action
-        elif action.startswith('/'):
-            parsed = urlparse(self.url)
-            form_url = f"{parsed.scheme}://{parsed.netloc}{action}"
+    @staticmethod
+    def techniques(point):
+        """Techniques run against an injection point (union and boolean need a query string)"""
+        if point.location == 'query':
+            return ['error', 'union', 'boolean', 'time']
+        return ['error', 'time']
+    
+    def test_point(self, point, technique):
+        """Run one technique against one injection point and return its findings
+        
+        Used by distributed workers, which receive single (point, technique)
+        jobs instead of whole pages.
+        """
+        if self.fingerprint is None:
+            self.fingerprint = PayloadStats.fingerprint(self.client.get(point.url, cache=True))
+        found = len(self.vulnerabilities)
+        query = point.location == 'query'
+        if technique == 'error':
+            self._test_error_based(point, 15 if query else 10)
+        elif technique == 'union':
+            self._test_union_based(point)
+        elif technique == 'boolean':
+            self._test_boolean_based(point)
+        elif technique == 'time':
+            self._queue_time_based(point, 5 if query else 3)
+            self._collect_time_based()
         else:
-            form_url = self.url.rstrip('/') + '/' + action.lstrip('/')
+            raise ValueError(f"Unknown SQL injection technique: {technique}")
+        return self.vulnerabilities[found:]
+    
+    def _scan_form(self, form):
+        """Scan form fields for SQL injection, using the form's own method
+        
+        GET form fields end up in a query string, so they get the same
+        techniques as URL parameters (see techniques()).
+        """
+        points = self.points.from_form(form, skip_types=('submit', 'button', 'hidden'))
+        if points and points[0].location == 'query':
+            print(f"{Fore.CYAN}  [*] Testing form at: {form['url']} (GET){Style.RESET_ALL}")
+            self._scan_get_parameters(points)
+            return
+        
+        points = [point for point in points if self.points.claim(point, 'sqli')]
+        if not points:
+            return
         
-        print(f"{Fore.CYAN}  [*] Testing form at: {form_url}{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}  [*] Testing form at: {form['url']} ({points[0].method}){Style.RESET_ALL}")
+        error_hits, _ = self._discover(points)
         
         # Test each input field
-        for input_field in inputs:
-            if input_field['type'] in ['submit', 'button', 'hidden']:
-                continue
-            
-            param_name = input_field['name']
-            if param_name in self.tested_params:
-                continue
-            
-            self.tested_params.add(param_name)
-            print(f"{Fore.CYAN}    [*] Testing field: {param_name}{Style.RESET_ALL}")
-            
-            # Build form data
-            form_data = {}
-            for inp in inputs:
-                form_data[inp['name']] = 'test'
+        for point in points:
+            print(f"{Fore.CYAN}    [*] Testing field: {point.name}{Style.RESET_ALL}")
             
             # Test error-based
-            if self._test_error_based_post(form_url, param_name, form_data):
+            if error_hits.get(point.name, False) is not False:
+                self._report_quote_error(point, error_hits[point.name])
+                continue
+            if self._test_error_based(point, 10, skip_quote=point.name in error_hits):
                 continue
             
-            # Test time-based
-            self._test_time_based_post(form_url, param_name, form_data)
+            # Queue time-based
+            self._queue_time_based(point, 3)
+        
+        self._finish(points)
     
-    def _test_error_based(self, param_name, param_value, params):
+    def _discover(self, points, boolean=False):
+        """Batched single-quote (and boolean pair) probes across all parameters of one request
+        
+        Returns (error_hits, boolean_hits) as {name: result} dicts holding the
+        parameters the batch settled (False for clean ones, see
+        BatchProber.bisect; a hit may be a falsy 5xx Response). Parameters
+        missing from a dict are tested one by one as usual. Below
+        BATCH_PROBE_MIN_PARAMETERS the baseline and split requests cost more
+        than they save, so nothing is batched.
+        """
+        if len(points) < BATCH_PROBE_MIN_PARAMETERS:
+            return {}, {}
+        
+        first = points[0]
+        base = first.params
+        prober = BatchProber(
+            lambda values, **kwargs: send_values(self.client, first.method, first.url, values, **kwargs),
+            base
+        )
+        names = [point.name for point in points]
+        quote = SQLPayloads.ERROR_BASED[0]
+        
+        def quote_test(group):
+            response = prober.send_probes({name: quote for name in group}, detector=self._error_detector())
+            if response is not None and response.detected:
+                return response
+            # A page changed by one parameter's quote can hide another's SQL error
+            return None if prober.changed(response) else False
+        
+        def boolean_test(group):
+            prober.requests += 2
+            responses = self._boolean_responses(
+                self._query_url(first.url, base),
+                self._query_url(first.url, prober.values({name: base[name] + SQLPayloads.BOOLEAN_BASED[0] for name in group})),
+                self._query_url(first.url, prober.values({name: base[name] + SQLPayloads.BOOLEAN_BASED[1] for name in group}))
+            )
+            evidence = self._boolean_evidence(*responses)
+            if evidence:
+                return evidence
+            return None if prober.changed(responses[1]) or prober.changed(responses[2]) else False
+        
+        error_hits = prober.bisect(names, quote_test)
+        boolean_hits = {}
+        if boolean and first.method == 'GET':
+            boolean_hits = prober.bisect(names, boolean_test)
+        print(f"{Fore.CYAN}  [*] Batched discovery: {prober.requests} request(s) for {len(names)} parameter(s){Style.RESET_ALL}")
+        return error_hits, boolean_hits
+    
+    def _report_quote_error(self, point, response):
+        """Report an error-based hit found by the batched single-quote probe"""
+        self._add_vulnerability(
+            vuln_type="Error-based SQL Injection",
+            param=point.name,
+            payload=SQLPayloads.ERROR_BASED[0],
+            method=point.method,
+            url=point.target_url,
+            evidence=self._error_evidence(response)
+        )
+        print(f"{Fore.GREEN}    [✓] Vulnerable to Error-based SQLi!{Style.RESET_ALL}")
+    
+    def _test_error_based(self, point, limit, skip_quote=False):
         """Test for error-based SQL injection"""
-        for payload in SQLPayloads.ERROR_BASED[:15]:  # Test first 15 payloads
-            test_params = params.copy()
-            test_params[param_name] = payload
-            
-            response = self._send_request(test_params)
-            if response and self._check_sql_errors(response.text):
-                self._add_vulnerability(
-                    vuln_type="Error-based SQL Injection",
-                    param=param_name,
-                    payload=payload,
-                    method="GET",
-                    evidence="SQL error detected in response"
-                )
-                print(f"{Fore.GREEN}    [✓] Vulnerable to Error-based SQLi!{Style.RESET_ALL}")
-                return True
+        payload, response = self._first_hit(
+            'sqli-error', self._error_payloads(skip_quote), limit,  # Test the best payloads
+            lambda p: point.send(self.client, p, detector=self._error_detector()),
+            # 'is not None': error pages are usually 5xx, and a 5xx Response is falsy
+            lambda p, response: response is not None and response.detected
+        )
+        if payload is not None:
+            self._add_vulnerability(
+                vuln_type="Error-based SQL Injection",
+                param=point.name,
+                payload=payload,
+                method=point.method,
+                url=point.target_url,
+                evidence=self._error_evidence(response)
+            )
+            print(f"{Fore.GREEN}    [✓] Vulnerable to Error-based SQLi ({point.method})!{Style.RESET_ALL}")
+            return True
         
         return False
     
-    def _test_union_based(self, param_name, param_value, params):
+    def _test_union_based(self, point):
         """Test for union-based SQL injection"""
-        for payload in SQLPayloads.UNION_BASED[:10]:  # Test first 10 payloads
-            test_params = params.copy()
-            test_params[param_name] = payload
-            
-            response = self._send_request(test_params)
-            if response:
-                # Check for successful UNION injection indicators
-                if self._check_union_success(response.text):
-                    self._add_vulnerability(
-                        vuln_type="Union-based SQL Injection",
-                        param=param_name,
-                        payload=payload,
-                        method="GET",
-                        evidence="Union query successful"
-                    )
-                    print(f"{Fore.GREEN}    [✓] Vulnerable to Union-based SQLi!{Style.RESET_ALL}")
-                    return True
+        # Check for successful UNION injection indicators
+        payload, _ = self._first_hit(
+            'sqli-union', self.payloads.query(category='sqli', technique='union'), 10,  # Test best 10 payloads
+            lambda p: point.send(self.client, p),
+            lambda p, response: response is not None and self._check_union_success(response.content)
+        )
+        if payload is not None:
+            self._add_vulnerability(
+                vuln_type="Union-based SQL Injection",
+                param=point.name,
+                payload=payload,
+                method=point.method,
+                url=point.target_url,
+                evidence="Union query successful"
+            )
+            print(f"{Fore.GREEN}    [✓] Vulnerable to Union-based SQLi!{Style.RESET_ALL}")
+            return True
         
         return False
     
-    def _test_boolean_based(self, param_name, param_value, params):
+    def _test_boolean_based(self, point):
         """Test for boolean-based blind SQL injection"""
-        # Get baseline response
-        baseline_response = self._send_request(params)
+        # True condition: AND '1'='1, false condition: AND '1'='2
+        evidence = self._boolean_difference(
+            f"{point.url}?{point.render(point.value)}",
+            f"{point.url}?{point.render(point.value + SQLPayloads.BOOLEAN_BASED[0])}",
+            f"{point.url}?{point.render(point.value + SQLPayloads.BOOLEAN_BASED[1])}"
+        )
+        if evidence:
+            self._report_boolean(point, evidence)
+            return True
+        
+        return False
+    
+    def _boolean_difference(self, baseline_url, true_url, false_url):
+        """Compare true/false condition responses with the baseline; return evidence or None"""
+        return self._boolean_evidence(*self._boolean_responses(baseline_url, true_url, false_url))
+    
+    def _boolean_responses(self, baseline_url, true_url, false_url):
+        """Send baseline, true and false requests concurrently"""
+        return self.client.gather([
+            ('GET', baseline_url, {'cache': True}),
+            ('GET', true_url, {}),
+            ('GET', false_url, {}),
+        ])
+    
+    @staticmethod
+    def _boolean_evidence(baseline_response, true_response, false_response):
+        """Evidence when the true condition matches the baseline and the false one does not, else None"""
         if not baseline_response:
-            return False
+            return None
         
         baseline_length = len(baseline_response.text)
         
-        # Test with true condition
-        true_params = params.copy()
-        true_params[param_name] = param_value + SQLPayloads.BOOLEAN_BASED[0]  # AND '1'='1
-        true_response = self._send_request(true_params)
-        
-        # Test with false condition
-        false_params = params.copy()
-        false_params[param_name] = param_value + SQLPayloads.BOOLEAN_BASED[1]  # AND '1'='2
-        false_response = self._send_request(false_params)
-        
         if true_response and false_response:
             true_length = len(true_response.text)
             false_length = len(false_response.text)
             
             # Check if responses differ significantly
             if abs(true_length - baseline_length) < 100 and abs(true_length - false_length) > 100:
-                self._add_vulnerability(
-                    vuln_type="Boolean-based Blind SQL Injection",
-                    param=param_name,
-                    payload=SQLPayloads.BOOLEAN_BASED[0],
-                    method="GET",
-                    evidence=f"Response length differs: True={true_length}, False={false_length}"
-                )
-                print(f"{Fore.GREEN}    [✓] Vulnerable to Boolean-based Blind SQLi!{Style.RESET_ALL}")
-                return True
+                return f"Response length differs: True={true_length}, False={false_length}"
         
-        return False
+        return None
     
-    def _test_time_based(self, param_name, param_value, params):
-        """Test for time-based blind SQL injection"""
-        for payload in SQLPayloads.TIME_BASED[:5]:  # Test first 5 payloads
-            test_params = params.copy()
-            test_params[param_name] = payload
-            
-            start_time = time.time()
-            response = self._send_request(test_params)
-            elapsed_time = time.time() - start_time
-            
-            # Check if response was delayed (indicating successful time-based injection)
-            if elapsed_time >= SQLI_DETECTION_TIMEOUT - 1:  # Allow 1 second tolerance
-                self._add_vulnerability(
-                    vuln_type="Time-based Blind SQL Injection",
-                    param=param_name,
-                    payload=payload,
-                    method="GET",
-                    evidence=f"Response delayed by {elapsed_time:.2f} seconds"
-                )
-                print(f"{Fore.GREEN}    [✓] Vulnerable to Time-based Blind SQLi!{Style.RESET_ALL}")
-                return True
-        
-        return False
+    def _report_boolean(self, point, evidence):
+        """Report a boolean-based blind SQL injection"""
+        self._add_vulnerability(
+            vuln_type="Boolean-based Blind SQL Injection",
+            param=point.name,
+            payload=SQLPayloads.BOOLEAN_BASED[0],
+            method=point.method,
+            url=point.target_url,
+            evidence=evidence
+        )
+        print(f"{Fore.GREEN}    [✓] Vulnerable to Boolean-based Blind SQLi!{Style.RESET_ALL}")
     
-    def _test_error_based_post(self, url, param_name, form_data):
-        """Test POST form for error-based SQL injection"""
-        for payload in SQLPayloads.ERROR_BASED[:10]:
-            test_data = form_data.copy()
-            test_data[param_name] = payload
-            
-            response = self.client.post(url, data=test_data)
-            if response and self._check_sql_errors(response.text):
-                self._add_vulnerability(
-                    vuln_type="Error-based SQL Injection",
-                    param=param_name,
-                    payload=payload,
-                    method="POST",
-                    url=url,
-                    evidence="SQL error detected in response"
-                )
-                print(f"{Fore.GREEN}      [✓] Vulnerable to Error-based SQLi (POST)!{Style.RESET_ALL}")
-                return True
-        
-        return False
+    def _queue_time_based(self, point, limit):
+        """Queue a time-based blind SQL injection test for an injection point"""
+        self._time_jobs.append((point, limit))
     
-    def _test_time_based_post(self, url, param_name, form_data):
-        """Test POST form for time-based SQL injection"""
-        for payload in SQLPayloads.TIME_BASED[:3]:
-            test_data = form_data.copy()
-            test_data[param_name] = payload
-            
-            start_time = time.time()
-            response = self.client.post(url, data=test_data)
-            elapsed_time = time.time() - start_time
+    def _collect_time_based(self):
+        """Run the queued time-based tests and report hits in queueing order
+        
+        They only start once every other probe of this scan is done, so the
+        payload fan-out does not skew their timing. Each endpoint's baseline
+        is measured before any delayed probe is sent; the tests then overlap
+        across injection points (TIME_BASED_PER_ENDPOINT per endpoint). On a
+        target that serves one request at a time, a probe queued behind
+        another parameter's sleep looks delayed too, so a hit on an endpoint
+        that had other tests running is re-tested with the endpoint to
+        itself before it is reported.
+        """
+        if not self._time_jobs:
+            return
+        
+        print(f"{Fore.CYAN}  [*] Running {len(self._time_jobs)} time-based test(s)...{Style.RESET_ALL}")
+        jobs, self._time_jobs = self._time_jobs, []
+        send_normal = lambda point: lambda: point.send(self.client, point.value)
+        run_test = lambda point, limit: lambda: self.time_engine.test(
+            (point.method, point.url),
+            send_normal(point),
+            lambda p: point.send(self.client, p, expect_delay=True),
+            self.payloads.query(technique='time-template', limit=limit)  # Test first few payloads
+        )
+        endpoints = {}  # endpoint -> first point, for the baseline
+        shared = {}  # endpoint -> number of tests on it
+        for point, _ in jobs:
+            endpoints.setdefault((point.method, point.url), point)
+            shared[(point.method, point.url)] = shared.get((point.method, point.url), 0) + 1
+        
+        scheduler = TimeBasedScheduler()
+        try:
+            # Baselines first, so no delayed probe is in flight while one is measured
+            for endpoint, point in endpoints.items():
+                scheduler.submit(endpoint, lambda endpoint=endpoint, point=point: self.time_engine.baseline(
+                    endpoint, send_normal(point)
+                ))
+            scheduler.join()
             
-            if elapsed_time >= SQLI_DETECTION_TIMEOUT - 1:
+            futures = [scheduler.submit((point.method, point.url), run_test(point, limit)) for point, limit in jobs]
+            scheduler.join()
+        finally:
+            scheduler.shutdown()
+        
+        for (point, limit), future in zip(jobs, futures):
+            try:
+                payload, evidence = future.result()
+                if payload is not None and shared[(point.method, point.url)] > 1:
+                    # Nothing else is running now: a real hit shows up again
+                    payload, evidence = run_test(point, limit)()
+            except Exception as e:
+                print(f"{Fore.RED}    [!] Time-based test of {point.name} failed: {str(e)}{Style.RESET_ALL}")
+                payload = None
+            if payload is not None:
                 self._add_vulnerability(
                     vuln_type="Time-based Blind SQL Injection",
-                    param=param_name,
+                    param=point.name,
                     payload=payload,
-                    method="POST",
-                    url=url,
-                    evidence=f"Response delayed by {elapsed_time:.2f} seconds"
+                    method=point.method,
+                    url=point.target_url,
+                    evidence=evidence
                 )
-                print(f"{Fore.GREEN}      [✓] Vulnerable to Time-based Blind SQLi (POST)!{Style.RESET_ALL}")
-                return True
-        
-        return False
+                print(f"{Fore.GREEN}    [✓] {point.name} vulnerable to Time-based Blind SQLi ({point.method})!{Style.RESET_ALL}")
+            self.points.finish(point, 'sqli')
     
-    def _send_request(self, params):
-        """Send GET request with parameters"""
-        parsed = urlparse(self.url)
-        query_string = urlencode(params)
-        test_url = urlunparse((
-            parsed.scheme,
-            parsed.netloc,
-            parsed.path,
-            parsed.params,
-            query_string,
-            parsed.fragment
-        ))
-        
-        return self.client.get(test_url)
+    def _finish(self, points):
+        """Mark points as tested unless a time-based test is still queued for them"""
+        queued = {point.key for point, _ in self._time_jobs}
+        for point in points:
+            if point.key not in queued:
+                self.points.finish(point, 'sqli')
     
-    def _check_sql_errors(self, response_text):
-        """Check if response contains SQL error messages"""
-        for signature in SQLPayloads.ERROR_SIGNATURES:
-            if signature.lower() in response_text.lower():
-                return True
-        return False
+    def _first_hit(self, technique, payloads, limit, probe, check):
+        """Send the best-ranked payloads concurrently and record the outcome"""
+        payloads = self.stats.order(technique, payloads, self.fingerprint)[:limit]
+        payload, response = self.fanout.first_hit(payloads, probe, check)
+        self.stats.record_first_hit(technique, payloads, payload, self.fingerprint)
+        return payload, response
+    
+    def _error_payloads(self, skip_quote=False):
+        """Error-based payloads, minus the single quote when batched discovery already cleared it"""
+        payloads = self.payloads.query(category='sqli', technique='error')
+        if skip_quote:
+            payloads = [p for p in payloads if p != SQLPayloads.ERROR_BASED[0]]
+        return payloads
     
-    def _check_union_success(self, response_text):
+    @staticmethod
+    def _query_url(url, values):
+        """URL with a full parameter dict as its query string"""
+        return f"{url}?{urlencode(values)}"
+    
+    @staticmethod
+    def _error_detector():
+        """Streaming detector that stops reading at the first SQL error signature"""
+        return MatcherDetector(SQL_ERROR_MATCHER)
+    
+    @staticmethod
+    def _error_evidence(response):
+        """Describe the matched SQL error signature and its DBMS"""
+        match = SQL_ERROR_MATCHER.search(response.content)
+        if match is None:
+            return "SQL error detected in response"
+        signature, dbms = match
+        return f"SQL error detected in response: '{signature}' ({dbms or 'generic'})"
+    
+    def _check_union_success(self, content):
         """Check for indicators of successful UNION injection"""
-        # Look for typical database information
-        indicators = [
-            r'\d+\.\d+\.\d+',  # Version numbers
-            r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}',  # UUIDs
-            'information_schema',
-            'mysql',
-            'postgres',
-            'mssql',
-        ]
-        
-        for indicator in indicators:
-            if re.search(indicator, response_text, re.IGNORECASE):
-                return True
-        return False
+        # Typical database information: versions, UUIDs, schema or DBMS names
+        return UNION_SUCCESS_MATCHER.search(content) is not None
     
     def _add_vulnerability(self, vuln_type, param, payload, method, evidence="", url=None):
         """Add vulnerability to results"""
@@ -358,6 +453,8 @@ class SQLInjectionScanner:
             'recommendation': 'Use parameterized queries or prepared statements. Validate and sanitize all user inputs.'
         }
         self.vulnerabilities.append(vuln)
+        if self.on_finding is not None:
+            self.on_finding(vuln)
     
     def _print_summary(self):
         """Print scan summary"""
@@ -0,0 +1,176 @@
+"""
+Statistical time-based blind SQL injection engine
+Calibrates the injected delay to each endpoint's latency and stops testing early
+"""
+
+import math
+import statistics
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from config import (SQLI_DETECTION_TIMEOUT, TIME_BASED_BASELINE_SAMPLES, TIME_BASED_MIN_DELAY,
+                    TIME_BASED_CONFIRMATIONS, TIME_BASED_PER_ENDPOINT, MAX_THREADS)
+
+
+class TimeBasedEngine:
+    """Time-based SQLi detection with adaptive sleep duration and a sequential test
+    
+    For every endpoint the engine first samples the normal response latency.
+    The injected delay is the smallest whole number of seconds that clearly
+    separates "slept" from "normal" responses (1 s on fast, stable targets),
+    capped at SQLI_DETECTION_TIMEOUT. Each payload is then tested round by
+    round: a delayed probe below the decision threshold rejects it at once,
+    otherwise a zero-delay control probe must come back fast. A payload is
+    reported only after TIME_BASED_CONFIRMATIONS consistent rounds. Failed or
+    timed-out requests never count as a delay.
+    """
+    
+    def __init__(self, baseline_samples=TIME_BASED_BASELINE_SAMPLES, min_delay=TIME_BASED_MIN_DELAY,
+                 max_delay=SQLI_DETECTION_TIMEOUT, confirmations=TIME_BASED_CONFIRMATIONS):
+        self.baseline_samples = baseline_samples
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.confirmations = confirmations
+        self._baselines = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _elapsed(response):
+        """Time until the response headers arrived, or None if the request failed"""
+        if response is None:
+            return None
+        return response.elapsed.total_seconds()
+    
+    def baseline(self, endpoint, send_normal):
+        """Measure (mean, stdev, max) latency of normal requests to an endpoint"""
+        with self._lock:
+            if endpoint in self._baselines:
+                return self._baselines[endpoint]
+        
+        samples = []
+        for _ in range(self.baseline_samples):
+            elapsed = self._elapsed(send_normal())
+            if elapsed is not None:
+                samples.append(elapsed)
+        
+        if not samples:
+            result = None
+        else:
+            mean = statistics.mean(samples)
+            stdev = statistics.stdev(samples) if len(samples) > 1 else mean
+            result = (mean, stdev, max(samples))
+        
+        with self._lock:
+            self._baselines[endpoint] = result
+        return result
+    
+    def choose_delay(self, baseline):
+        """Smallest delay whose midpoint sits well clear of the baseline jitter"""
+        mean, stdev, slowest = baseline
+        needed = 2 * ((slowest - mean) + 4 * stdev)
+        return int(min(self.max_delay, max(self.min_delay, math.ceil(needed))))
+    
+    def test(self, endpoint, send_normal, send_payload, templates):
+        """Test payload templates against one injection point
+        
+        send_normal() sends the unmodified request; send_payload(payload)
+        sends one injected request. Templates contain a {delay} placeholder.
+        Returns (payload, evidence) for the first confirmed template, or
+        (None, None).
+        """
+        baseline = self.baseline(endpoint, send_normal)
+        if baseline is None:
+            return None, None
+        
+        mean = baseline[0]
+        delay = self.choose_delay(baseline)
+        # Decide between "mean" and "mean + delay" at the midpoint
+        threshold = mean + delay / 2.0
+        
+        for template in templates:
+            payload = template.format(delay=delay)
+            control = template.format(delay=0)
+            delayed_times = []
+            control_times = []
+            
+            for _ in range(self.confirmations):
+                elapsed = self._elapsed(send_payload(payload))
+                if elapsed is None or elapsed < threshold:
+                    break
+                control_elapsed = self._elapsed(send_payload(control))
+                if control_elapsed is None or control_elapsed >= threshold:
+                    break
+                delayed_times.append(elapsed)
+                control_times.append(control_elapsed)
+            
+            if len(delayed_times) == self.confirmations:
+                evidence = (
+                    f"Injected {delay}s delay: responses took "
+                    f"{', '.join(f'{t:.2f}' for t in delayed_times)} seconds; "
+                    f"zero-delay controls {', '.join(f'{t:.2f}' for t in control_times)} seconds; "
+                    f"baseline {mean:.2f} seconds"
+                )
+                return payload, evidence
+        
+        return None, None
+
+
+class TimeBasedScheduler:
+    """Run time-based tests for different injection points at the same time
+    
+    Sleep probes spend almost all their time waiting, so tests are
+    overlapped on a worker pool. Tests that share an endpoint run at most
+    per_endpoint at a time; set it to 1 for targets that serve one request
+    at a time, where one parameter's injected delay would slow down the
+    probes of the others.
+    """
+    
+    def __init__(self, max_workers=MAX_THREADS, per_endpoint=TIME_BASED_PER_ENDPOINT):
+        self.per_endpoint = max(1, per_endpoint)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                           thread_name_prefix='time-based')
+        self._queues = {}
+        self._running = {}
+        self._pending = 0
+        self._cond = threading.Condition()
+    
+    def submit(self, endpoint, func):
+        """Queue func() for an endpoint and return a Future for its result"""
+        future = Future()
+        with self._cond:
+            self._queues.setdefault(endpoint, deque()).append((func, future))
+            self._pending += 1
+            self._dispatch(endpoint)
+        return future
+    
+    def _dispatch(self, endpoint):
+        """Start queued jobs for an endpoint while it has free slots (lock held)"""
+        queue = self._queues[endpoint]
+        while queue and self._running.get(endpoint, 0) < self.per_endpoint:
+            func, future = queue.popleft()
+            self._running[endpoint] = self._running.get(endpoint, 0) + 1
+            self.executor.submit(self._run, endpoint, func, future)
+    
+    def _run(self, endpoint, func, future):
+        """Run one job and hand the endpoint slot to the next queued job"""
+        try:
+            future.set_result(func())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._cond:
+                self._running[endpoint] -= 1
+                self._pending -= 1
+                self._dispatch(endpoint)
+                self._cond.notify_all()
+    
+    def join(self):
+        """Wait until every queued job has finished"""
+        with self._cond:
+            while self._pending:
+                self._cond.wait()
+    
+    def shutdown(self):
+        """Stop worker threads"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,190 @@
+"""
+Single-pass XSS reflection detector
+Finds an unencoded payload in the raw response bytes and classifies the context it lands in
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+from config import XSS_FEATURE_CACHE_SIZE
+from payloads.xss_payloads import XSSPayloads
+
+# Elements whose content is not parsed as markup until their closing tag
+RAWTEXT_TAGS = (b'script', b'style', b'textarea', b'title', b'xmp', b'noscript')
+
+# Attributes whose value is loaded or navigated to as a URL
+URL_ATTRIBUTES = frozenset([b'href', b'src', b'action', b'formaction', b'data', b'background'])
+
+# Payload features, compiled once
+TAG_OPEN = re.compile(rb'<[a-z!/]', re.IGNORECASE)
+NEW_TAG = re.compile(rb'<[a-z]', re.IGNORECASE)
+EVENT_HANDLER = re.compile(rb'\bon[a-z]+\s*=', re.IGNORECASE)
+DETECTION_REGEX = re.compile(
+    '|'.join(f'(?:{p})' for p in XSSPayloads.XSS_DETECTION_PATTERNS).encode('utf-8'),
+    re.IGNORECASE | re.DOTALL
+)
+
+ATTR_NAME_QUOTED = re.compile(rb'([^\s"\'<>/=]+)\s*=\s*$')
+ATTR_NAME_UNQUOTED = re.compile(rb'([^\s"\'<>/=]+)\s*=\s*[^\s"\'>]*$')
+
+
+class ReflectionDetector:
+    """Decide whether a reflected payload would execute, without decoding the page
+    
+    The body is searched for the payload bytes exactly as sent, so HTML-encoded
+    reflections (which are not executable) are ignored and the document is
+    never unescaped. Only when the payload is present is the text before it
+    inspected, with a handful of reverse substring searches, to classify the
+    context: html, attribute, url, tag, script, comment or rawtext. The
+    payload's own features are analysed once and kept in a bounded LRU cache,
+    so the per-response cost does not grow with the payload list and unique
+    generated payloads (canaries, markers) cannot grow the cache forever.
+    """
+    
+    def __init__(self, max_features=XSS_FEATURE_CACHE_SIZE):
+        self.max_features = max_features
+        self._features = OrderedDict()  # payload -> features
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _to_bytes(value):
+        if isinstance(value, str):
+            return value.encode('utf-8')
+        return value
+    
+    def _payload_features(self, payload):
+        """(lowered payload, opens a tag, opens a new element, has event handler, matches detection patterns)"""
+        with self._lock:
+            features = self._features.get(payload)
+            if features is not None:
+                self._features.move_to_end(payload)
+                return features
+        features = (
+            payload.lower(),
+            TAG_OPEN.search(payload) is not None,
+            NEW_TAG.search(payload) is not None,
+            EVENT_HANDLER.search(payload) is not None,
+            DETECTION_REGEX.search(payload) is not None,
+        )
+        with self._lock:
+            self._features[payload] = features
+            while len(self._features) > self.max_features:
+                self._features.popitem(last=False)
+        return features
+    
+    def classify(self, body, position, lowered=None):
+        """Return (context, detail) for a byte offset in an HTML document
+        
+        detail is the raw-text element name, the attribute quote character,
+        or None.
+        """
+        if lowered is None:
+            lowered = body.lower()
+        
+        # Inside a comment or a raw-text element opened later than it was closed
+        innermost, context, detail = -1, None, None
+        start = lowered.rfind(b'<!--', 0, position)
+        if start > lowered.rfind(b'-->', 0, position):
+            innermost, context = start, 'comment'
+        for tag in RAWTEXT_TAGS:
+            start = lowered.rfind(b'<' + tag, 0, position)
+            if start > innermost and start > lowered.rfind(b'</' + tag, 0, position):
+                # Only counts once the opening tag itself is closed
+                if body.find(b'>', start, position) != -1:
+                    innermost = start
+                    context = 'script' if tag == b'script' else 'rawtext'
+                    detail = tag
+        if context is not None:
+            return context, detail
+        
+        tag_start = body.rfind(b'<', 0, position)
+        if tag_start == -1 or body.rfind(b'>', 0, position) > tag_start:
+            return 'html', None
+        
+        # Inside a tag: find out whether we are in a quoted attribute value
+        segment = body[tag_start:position]
+        quote, quote_at = None, -1
+        for i, char in enumerate(segment):
+            if quote is None and char in b'"\'':
+                quote, quote_at = char, i
+            elif char == quote:
+                quote = None
+        
+        if quote is not None:
+            match = ATTR_NAME_QUOTED.search(segment, 0, quote_at)
+            name = match.group(1).lower() if match else b''
+            return ('url' if name in URL_ATTRIBUTES else 'attribute'), bytes([quote])
+        
+        match = ATTR_NAME_UNQUOTED.search(segment)
+        if match is None:
+            return 'tag', None
+        name = match.group(1).lower()
+        return ('url' if name in URL_ATTRIBUTES else 'attribute'), b''
+    
+    def _executes(self, payload, features, context, detail):
+        """Would this payload run when reflected in the given context?"""
+        lowered, opens_tag, new_tag, has_event, known_vector = features
+        active = new_tag or has_event or known_vector
+        
+        if context == 'html':
+            return opens_tag and active
+        if context == 'tag':
+            return has_event or new_tag
+        if context in ('attribute', 'url'):
+            if context == 'url' and lowered.lstrip().startswith(b'javascript:'):
+                return True
+            if detail:
+                # Quoted value: the payload must close the quote first
+                return detail in payload and active
+            return (b' ' in payload or b'>' in payload) and active
+        if context == 'script':
+            return b'</script' in lowered or any(c in payload for c in b'\'";')
+        if context == 'comment':
+            return b'-->' in payload and new_tag
+        if context == 'rawtext':
+            return b'</' + detail in lowered and new_tag
+        return False
+    
+    def contexts(self, token, body):
+        """Return the distinct (context, detail) pairs a harmless token is reflected in, in page order"""
+        token = self._to_bytes(token)
+        body = self._to_bytes(body)
+        if not token or not body:
+            return []
+        
+        found = []
+        lowered = None
+        position = body.find(token)
+        while position != -1:
+            if lowered is None:
+                lowered = body.lower()
+            context = self.classify(body, position, lowered)
+            if context not in found:
+                found.append(context)
+            position = body.find(token, position + len(token))
+        return found
+    
+    def find(self, payload, body):
+        """Return the context of the first executable reflection, or None"""
+        payload = self._to_bytes(payload)
+        body = self._to_bytes(body)
+        if not payload or not body:
+            return None
+        
+        position = body.find(payload)
+        if position == -1:
+            return None
+        
+        features = self._payload_features(payload)
+        lowered = body.lower()
+        while position != -1:
+            context, detail = self.classify(body, position, lowered)
+            if self._executes(payload, features, context, detail):
+                return context
+            position = body.find(payload, position + 1)
+        return None
+
+
+# Shared detector, built once when the module loads
+REFLECTION_DETECTOR = ReflectionDetector()
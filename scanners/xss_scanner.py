@@ -3,230 +3,193 @@ XSS (Cross-Site Scripting) Scanner Module
 Automatically detects XSS vulnerabilities in web applications
 """
 
-import re
 import time
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-from bs4 import BeautifulSoup
 from colorama import Fore, Style
 
 from utils.http_client import HTTPClient
+from utils.attack_surface import AttackSurface
+from utils.injection_points import InjectionPointRegistry, send_values
+from utils.fanout import PayloadFanout
+from utils.batch_probe import BatchProber
 from payloads.xss_payloads import XSSPayloads
-from config import XSS_MAX_PAYLOADS
+from payloads.payload_stats import PayloadStats
+from payloads.registry import PayloadRegistry
+from scanners.xss_detector import REFLECTION_DETECTOR
+from config import XSS_MAX_PAYLOADS, BATCH_PROBE_MIN_PARAMETERS
+
+# Payload families tried for each reflection context, most specific first
+CONTEXT_TECHNIQUES = {
+    'html': ['html', 'basic', 'event', 'polyglot'],
+    'comment': ['polyglot'],
+    'rawtext': ['html', 'polyglot'],
+    'tag': ['attribute'],
+    'attribute': ['attribute', 'polyglot'],
+    'url': ['polyglot', 'attribute'],
+    'script': ['js', 'polyglot'],
+}
 
 
 class XSSScanner:
     """XSS vulnerability scanner"""
     
-    def __init__(self, url):
+    def __init__(self, url, client=None, stats=None, surface=None, points=None, on_finding=None):
         self.url = url
-        self.client = HTTPClient()
+        self.client = client or HTTPClient()
+        self.surface = surface or AttackSurface(self.client)
+        self.points = points if points is not None else InjectionPointRegistry()
+        self.stats = stats or PayloadStats()
+        self.payloads = PayloadRegistry.default()
+        self.fingerprint = None
+        self.fanout = PayloadFanout(self.client.workers)
         self.vulnerabilities = []
-        self.tested_params = set()
+        self.on_finding = on_finding  # Called with each finding as it is reported
         self.stored_xss_payloads = {}  # Track payloads for Stored XSS detection
     
     def scan(self):
         """Main scan function"""
         print(f"{Fore.CYAN}[*] Starting XSS scan on: {self.url}{Style.RESET_ALL}")
         
+        # Technology fingerprint used to pick learned payload ordering
+        self.fingerprint = PayloadStats.fingerprint(self.client.get(self.url, cache=True))
+        
         # Get parameters from URL
-        params = self._get_url_parameters()
+        points = self.points.from_url(self.url)
         
         # Scan GET parameters
-        if params:
-            print(f"{Fore.YELLOW}[*] Testing GET parameters for Reflected XSS: {list(params.keys())}{Style.RESET_ALL}")
-            self._scan_get_parameters(params)
+        if points:
+            print(f"{Fore.YELLOW}[*] Testing GET parameters for Reflected XSS: {[point.name for point in points]}{Style.RESET_ALL}")
+            self._scan_get_parameters(points)
         
-        # Scan POST forms
-        forms = self._get_forms()
+        # Scan forms
+        forms = self.surface.forms(self.url)
         if forms:
             print(f"{Fore.YELLOW}[*] Found {len(forms)} form(s), testing for XSS...{Style.RESET_ALL}")
             for form in forms:
-                self._scan_post_form(form)
+                self._scan_form(form)
         
         # Check for Stored XSS
         if self.stored_xss_payloads:
             print(f"{Fore.YELLOW}[*] Checking for Stored XSS...{Style.RESET_ALL}")
             self._check_stored_xss()
         
+        self.stats.save()
+        
         # Print summary
         self._print_summary()
         
         return self.vulnerabilities
     
-    def _get_url_parameters(self):
-        """Extract parameters from URL"""
-        parsed = urlparse(self.url)
-        params = parse_qs(parsed.query)
-        # Convert lists to single values
-        return {k: v[0] if isinstance(v, list) else v for k, v in params.items()}
-    
-    def _get_forms(self):
-        """Extract forms from the webpage"""
-        try:
-            response = self.client.get(self.url)
-            if not response:
-                return []
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            forms = soup.find_all('form')
-            
-            form_details = []
-            for form in forms:
-                action = form.get('action', '')
-                method = form.get('method', 'get').lower()
-                inputs = []
-                
-                for input_tag in form.find_all(['input', 'textarea', 'select']):
-                    input_type = input_tag.get('type', 'text')
-                    input_name = input_tag.get('name')
-                    if input_name:
-                        inputs.append({
-                            'type': input_type,
-                            'name': input_name
-                        })
-                
-                if inputs:
-                    form_details.append({
-                        'action': action,
-                        'method': method,
-                        'inputs': inputs
-                    })
-            
-            return form_details
-        except Exception as e:
-            print(f"{Fore.RED}[!] Error parsing forms: {str(e)}{Style.RESET_ALL}")
-            return []
-    
-    def _scan_get_parameters(self, params):
+    def _scan_get_parameters(self, points):
         """Scan GET parameters for Reflected XSS"""
-        for param_name, param_value in params.items():
-            if param_name in self.tested_params:
-                continue
-            
-            self.tested_params.add(param_name)
-            print(f"{Fore.CYAN}  [*] Testing parameter: {param_name}{Style.RESET_ALL}")
+        points = [point for point in points if self.points.claim(point, 'xss')]
+        reflections = self._discover_reflections(points)
+        
+        for point in points:
+            print(f"{Fore.CYAN}  [*] Testing parameter: {point.name}{Style.RESET_ALL}")
             
-            # Test basic XSS payloads
-            self._test_reflected_xss(param_name, param_value, params, "GET")
+            # Test payloads that fit where the input is reflected
+            self._test_reflected_xss(point, XSS_MAX_PAYLOADS, contexts=reflections.get(point.name))
+            self.points.finish(point, 'xss')
     
-    def _scan_post_form(self, form):
-        """Scan POST form for XSS"""
-        action = form['action']
-        method = form['method']
-        inputs = form['inputs']
+    @staticmethod
+    def techniques(point):
+        """Techniques run against an injection point (GET forms only reflect)"""
+        if point.method == 'GET':
+            return ['reflected']
+        return ['reflected', 'stored']
+    
+    def test_point(self, point, technique):
+        """Run one technique against one injection point and return its findings
         
-        # Build form URL
-        if action.startswith('http'):
-            form_url = action
-        elif action.startswith('/'):
-            parsed = urlparse(self.url)
-            form_url = f"{parsed.scheme}://{parsed.netloc}{action}"
+        Used by distributed workers, which receive single (point, technique)
+        jobs instead of whole pages.
+        """
+        if self.fingerprint is None:
+            self.fingerprint = PayloadStats.fingerprint(self.client.get(point.url, cache=True))
+        found = len(self.vulnerabilities)
+        if technique == 'reflected':
+            self._test_reflected_xss(point, XSS_MAX_PAYLOADS if point.location == 'query' else 15)
+        elif technique == 'stored':
+            if not self._test_stored_xss(point) and self.stored_xss_payloads:
+                self._check_stored_xss()
+            self.stored_xss_payloads = {}
         else:
-            form_url = self.url.rstrip('/') + '/' + action.lstrip('/')
+            raise ValueError(f"Unknown XSS technique: {technique}")
+        return self.vulnerabilities[found:]
+    
+    def _scan_form(self, form):
+        """Scan form fields for XSS, using the form's own method"""
+        points = [point for point in self.points.from_form(form) if self.points.claim(point, 'xss')]
+        if not points:
+            return
         
-        print(f"{Fore.CYAN}  [*] Testing form at: {form_url}{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}  [*] Testing form at: {form['url']} ({points[0].method}){Style.RESET_ALL}")
+        reflections = self._discover_reflections(points)
         
         # Test each input field
-        for input_field in inputs:
-            if input_field['type'] in ['submit', 'button']:
-                continue
-            
-            param_name = input_field['name']
-            if param_name in self.tested_params:
-                continue
+        for point in points:
+            print(f"{Fore.CYAN}    [*] Testing field: {point.name}{Style.RESET_ALL}")
             
-            self.tested_params.add(param_name)
-            print(f"{Fore.CYAN}    [*] Testing field: {param_name}{Style.RESET_ALL}")
+            # Test Reflected XSS (GET form fields get the URL parameter budget, as in test_point())
+            limit = XSS_MAX_PAYLOADS if point.location == 'query' else 15
+            self._test_reflected_xss(point, limit, contexts=reflections.get(point.name))
             
-            # Build form data
-            form_data = {}
-            for inp in inputs:
-                if inp['name'] == param_name:
-                    form_data[inp['name']] = 'test'
-                else:
-                    form_data[inp['name']] = 'normalvalue'
-            
-            # Test Reflected XSS
-            self._test_reflected_xss_post(form_url, param_name, form_data)
-            
-            # Test Stored XSS by submitting payload
-            self._test_stored_xss_post(form_url, param_name, form_data)
+            # Test Stored XSS by submitting payload (GET forms only reflect)
+            if point.method != 'GET':
+                self._test_stored_xss(point)
+            self.points.finish(point, 'xss')
     
-    def _test_reflected_xss(self, param_name, param_value, params, method="GET"):
+    def _test_reflected_xss(self, point, limit, contexts=None):
         """Test for Reflected XSS"""
-        payloads = XSSPayloads.get_basic_payloads()[:XSS_MAX_PAYLOADS]
+        send = lambda p: point.send(self.client, p)
+        payloads = self._reflection_payloads(send, contexts)
+        if not payloads:
+            return False
         
-        for payload in payloads:
-            test_params = params.copy()
-            test_params[param_name] = payload
-            
-            response = self._send_get_request(test_params)
-            
-            if response and self._check_xss_in_response(payload, response.text):
-                self._add_vulnerability(
-                    vuln_type="Reflected XSS",
-                    param=param_name,
-                    payload=payload,
-                    method=method,
-                    evidence="Payload reflected in response without sanitization"
-                )
-                print(f"{Fore.GREEN}    [✓] Vulnerable to Reflected XSS!{Style.RESET_ALL}")
-                return True
+        payload, response = self._first_hit(
+            'xss-reflected', payloads, limit, send,
+            lambda p, response: response is not None and self._check_xss_in_response(p, response.content)
+        )
+        if payload is not None:
+            self._add_vulnerability(
+                vuln_type="Reflected XSS",
+                param=point.name,
+                payload=payload,
+                method=point.method,
+                url=point.target_url,
+                evidence=self._reflection_evidence(payload, response)
+            )
+            print(f"{Fore.GREEN}    [✓] Vulnerable to Reflected XSS ({point.method})!{Style.RESET_ALL}")
+            return True
         
         return False
     
-    def _test_reflected_xss_post(self, url, param_name, form_data):
-        """Test POST form for Reflected XSS"""
-        payloads = XSSPayloads.get_basic_payloads()[:15]
-        
-        for payload in payloads:
-            test_data = form_data.copy()
-            test_data[param_name] = payload
-            
-            response = self.client.post(url, data=test_data)
-            
-            if response and self._check_xss_in_response(payload, response.text):
-                self._add_vulnerability(
-                    vuln_type="Reflected XSS",
-                    param=param_name,
-                    payload=payload,
-                    method="POST",
-                    url=url,
-                    evidence="Payload reflected in response without sanitization"
-                )
-                print(f"{Fore.GREEN}      [✓] Vulnerable to Reflected XSS (POST)!{Style.RESET_ALL}")
-                return True
-        
-        return False
-    
-    def _test_stored_xss_post(self, url, param_name, form_data):
-        """Test POST form for Stored XSS by submitting payload"""
+    def _test_stored_xss(self, point):
+        """Test a form field for Stored XSS by submitting payload"""
         # Generate unique payload
         payload, unique_id = XSSPayloads.generate_unique_payload("basic")
         
-        test_data = form_data.copy()
-        test_data[param_name] = payload
-        
         # Submit the payload
-        response = self.client.post(url, data=test_data)
+        response = point.send(self.client, payload)
         
-        if response:
+        # A 4xx/5xx Response is falsy, but an error page can still store or echo the payload
+        if response is not None:
             # Store payload info for later verification
             self.stored_xss_payloads[unique_id] = {
-                'url': url,
-                'param': param_name,
+                'url': point.url,
+                'param': point.name,
+                'method': point.method,
                 'payload': payload,
-                'form_data': form_data
             }
             
             # Immediately check if payload is stored in response
-            if self._check_xss_in_response(payload, response.text):
+            if self._check_xss_in_response(payload, response.content):
                 self._add_vulnerability(
                     vuln_type="Stored XSS",
-                    param=param_name,
+                    param=point.name,
                     payload=payload,
-                    method="POST",
-                    url=url,
+                    method=point.method,
+                    url=point.url,
                     evidence=f"Payload stored and reflected (ID: {unique_id})"
                 )
                 print(f"{Fore.GREEN}      [✓] Vulnerable to Stored XSS!{Style.RESET_ALL}")
@@ -241,66 +204,94 @@ class XSSScanner:
         # Wait a bit for the data to be stored
         time.sleep(1)
         
-        for unique_id, payload_info in self.stored_xss_payloads.items():
-            # Re-fetch the page to check if payload is stored
-            response = self.client.get(payload_info['url'])
-            
-            if response and unique_id in response.text:
+        # Re-fetch the pages concurrently to check if payloads are stored
+        stored = list(self.stored_xss_payloads.items())
+        responses = self.client.gather([('GET', info['url'], {'cache': True}) for _, info in stored])
+        
+        for (unique_id, payload_info), response in zip(stored, responses):
+            if response is not None and unique_id.encode('utf-8') in response.content:
                 # Check if it's actually executable XSS
-                if self._check_xss_in_response(payload_info['payload'], response.text):
+                if self._check_xss_in_response(payload_info['payload'], response.content):
                     self._add_vulnerability(
                         vuln_type="Stored XSS",
                         param=payload_info['param'],
                         payload=payload_info['payload'],
-                        method="POST",
+                        method=payload_info['method'],
                         url=payload_info['url'],
                         evidence=f"Payload persistently stored and reflected (ID: {unique_id})"
                     )
                     print(f"{Fore.GREEN}    [✓] Confirmed Stored XSS (ID: {unique_id})!{Style.RESET_ALL}")
     
-    def _check_xss_in_response(self, payload, response_text):
-        """Check if XSS payload is reflected in response without proper encoding"""
-        # Remove HTML encoding to check raw payload
-        import html
-        decoded_response = html.unescape(response_text)
+    def _check_xss_in_response(self, payload, content):
+        """Check if XSS payload is reflected in response without proper encoding
         
-        # Check if payload appears unencoded
-        if payload in decoded_response:
-            # Verify it's not just in comments or script strings
-            # Check if it's in dangerous contexts
-            dangerous_contexts = [
-                f">{payload}<",  # Between tags
-                f">{payload}",   # After opening tag
-                f"{payload}<",   # Before closing tag
-                f'"{payload}"',  # In attribute value
-                f"'{payload}'",  # In attribute value
-            ]
-            
-            for context in dangerous_contexts:
-                if context in decoded_response:
-                    return True
-            
-            # Also check with regex patterns
-            for pattern in XSSPayloads.XSS_DETECTION_PATTERNS:
-                if re.search(pattern, decoded_response, re.IGNORECASE):
-                    return True
+        Returns the context the payload executes in (e.g. 'html', 'attribute'),
+        or None.
+        """
+        return REFLECTION_DETECTOR.find(payload, content)
+    
+    def _reflection_evidence(self, payload, response):
+        """Evidence string naming the context the payload was reflected in"""
+        context = self._check_xss_in_response(payload, response.content)
+        return f"Payload reflected unencoded in {context} context"
+    
+    def _first_hit(self, technique, payloads, limit, probe, check):
+        """Send the best-ranked payloads concurrently and record the outcome"""
+        payloads = self.stats.order(technique, payloads, self.fingerprint)[:limit]
+        payload, response = self.fanout.first_hit(payloads, probe, check)
+        self.stats.record_first_hit(technique, payloads, payload, self.fingerprint)
+        return payload, response
+    
+    def _discover_reflections(self, points):
+        """Send a distinct canary in every parameter of one request and map each to its reflection contexts
         
-        return False
+        Parameters the batch could not settle (e.g. because another
+        parameter's canary changed the page) are missing from the result
+        and get their own canary request, as do all parameters of requests
+        with fewer than BATCH_PROBE_MIN_PARAMETERS.
+        """
+        if len(points) < BATCH_PROBE_MIN_PARAMETERS:
+            return {}
+        
+        first = points[0]
+        prober = BatchProber(
+            lambda values: send_values(self.client, first.method, first.url, values), first.params
+        )
+        reflections = prober.attribute(
+            [point.name for point in points],
+            lambda name: XSSPayloads.generate_canary(),
+            lambda response, canary: REFLECTION_DETECTOR.contexts(canary, response.content)
+        )
+        print(f"{Fore.CYAN}  [*] Batched canary probe: {sum(1 for c in reflections.values() if c)}/{len(points)} parameter(s) reflected, {len(points) - len(reflections)} left to probe alone{Style.RESET_ALL}")
+        return reflections
     
-    def _send_get_request(self, params):
-        """Send GET request with parameters"""
-        parsed = urlparse(self.url)
-        query_string = urlencode(params)
-        test_url = urlunparse((
-            parsed.scheme,
-            parsed.netloc,
-            parsed.path,
-            parsed.params,
-            query_string,
-            parsed.fragment
-        ))
+    def _reflection_payloads(self, send, contexts=None):
+        """Pick payloads for the contexts a harmless canary is reflected in
+        
+        Without known contexts a canary is sent first. Returns an empty list
+        when the canary does not come back, so the parameter is skipped.
+        """
+        if contexts is None:
+            canary = XSSPayloads.generate_canary()
+            response = send(canary)
+            # Error pages (4xx/5xx, falsy Response objects) can reflect input too
+            contexts = REFLECTION_DETECTOR.contexts(canary, response.content) if response is not None else []
+        if not contexts:
+            print(f"{Fore.CYAN}      [-] Input not reflected, skipping{Style.RESET_ALL}")
+            return []
         
-        return self.client.get(test_url)
+        print(f"{Fore.CYAN}      [*] Reflected in: {', '.join(c for c, _ in contexts)}{Style.RESET_ALL}")
+        payloads = []
+        for context, detail in contexts:
+            selected = []
+            for technique in CONTEXT_TECHNIQUES[context]:
+                selected += self.payloads.query(category='xss', technique=technique)
+            if context in ('attribute', 'url') and detail:
+                # Quoted attribute: payloads that close this quote first
+                quote = detail.decode('ascii')
+                selected.sort(key=lambda p: quote not in p)
+            payloads += selected
+        return list(dict.fromkeys(payloads))
     
     def _add_vulnerability(self, vuln_type, param, payload, method, evidence="", url=None):
         """Add vulnerability to results"""
@@ -316,6 +307,8 @@ class XSSScanner:
             'recommendation': 'Encode all user inputs before rendering. Use Content Security Policy (CSP). Validate and sanitize all user inputs.'
         }
         self.vulnerabilities.append(vuln)
+        if self.on_finding is not None:
+            self.on_finding(vuln)
     
     def _print_summary(self):
         """Print scan summary"""
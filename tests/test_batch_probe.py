@@ -0,0 +1,117 @@
+"""
+Batched discovery probes must not hide parameters behind one that changes the page
+"""
+
+from urllib.parse import urlparse, parse_qsl
+
+from utils.batch_probe import BatchProber
+from utils.injection_points import InjectionPointRegistry
+from scanners.signature_matcher import SQL_ERROR_MATCHER
+from scanners.sql_injection import SQLInjectionScanner
+from scanners.xss_scanner import XSSScanner
+from scanners.xss_detector import REFLECTION_DETECTOR
+from payloads.payload_stats import PayloadStats
+
+URL = "http://target.test/multi?id=1&q=x&page=2&sort=asc"
+
+
+class FakeResponse:
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content.encode('utf-8')
+        self.text = content
+        self.detected = False
+    
+    def __bool__(self):
+        # Like requests.Response: falsy for 4xx/5xx
+        return self.status_code < 400
+
+
+def multi_page(values):
+    """A validated numeric id that answers "invalid id", and a reflected, injectable q"""
+    if not values.get('id', '').isdigit():
+        return FakeResponse(200, "<p>invalid id</p>")
+    q = values.get('q', '')
+    if "'" in q:
+        return FakeResponse(500, f"<p>SQL Error: sqlite3.OperationalError near \"{q}\"</p>")
+    return FakeResponse(200, f"<html><nav>{'menu ' * 40}</nav><p>Results for {q}</p></html>")
+
+
+class FakeClient:
+    """Answers GET requests from multi_page and applies streaming detectors to the body"""
+    
+    workers = None  # Discovery never fans out
+    
+    def __init__(self):
+        self.requests = []
+    
+    def get(self, url, detector=None, **kwargs):
+        self.requests.append(url)
+        response = multi_page(dict(parse_qsl(urlparse(url).query)))
+        if detector is not None:
+            response.detected = SQL_ERROR_MATCHER.search(response.content) is not None
+        return response
+
+
+def prober():
+    return BatchProber(multi_page, {'id': '1', 'q': 'x'})
+
+
+def test_attribute_probes_again_when_a_canary_changes_the_page():
+    markers = iter(['canaryid', 'canaryq', 'canaryid2', 'canaryq2'])
+    reflections = prober().attribute(
+        ['id', 'q'],
+        lambda name: next(markers),
+        lambda response, canary: REFLECTION_DETECTOR.contexts(canary, response.content)
+    )
+    assert reflections['q']
+    assert not reflections.get('id')
+
+
+def test_bisect_does_not_clear_parameters_behind_a_changed_page():
+    batch = prober()
+    
+    def quote_test(group):
+        response = batch.send_probes({name: "'" for name in group})
+        if SQL_ERROR_MATCHER.search(response.content):
+            return response
+        return None if batch.changed(response) else False
+    
+    hits = batch.bisect(['id', 'q'], quote_test)
+    assert hits['q'] is not False
+    assert 'id' not in hits
+
+
+def test_scanners_find_q_on_a_page_with_a_validated_id(tmp_path):
+    client = FakeClient()
+    stats = PayloadStats(path=str(tmp_path / 'stats.json'), enabled=False)
+    points = InjectionPointRegistry().from_url(URL)
+    
+    xss = XSSScanner(URL, client=client, stats=stats)
+    assert xss._discover_reflections(points)['q']
+    
+    sqli = SQLInjectionScanner(URL, client=client, stats=stats)
+    error_hits, _ = sqli._discover(points)
+    assert error_hits.get('q', False) is not False
+    assert 'id' not in error_hits
+
+
+def test_sql_error_on_a_500_page_is_a_hit(tmp_path):
+    client = FakeClient()
+    stats = PayloadStats(path=str(tmp_path / 'stats.json'), enabled=False)
+    points = InjectionPointRegistry().from_url(URL)
+    
+    sqli = SQLInjectionScanner(URL, client=client, stats=stats)
+    error_hits, _ = sqli._discover(points)
+    assert error_hits['q'] is not False
+    assert error_hits['q'].status_code == 500
+
+
+def test_requests_with_few_parameters_are_not_batched(tmp_path):
+    client = FakeClient()
+    stats = PayloadStats(path=str(tmp_path / 'stats.json'), enabled=False)
+    points = InjectionPointRegistry().from_url("http://target.test/multi?id=1&q=x")
+    
+    sqli = SQLInjectionScanner(URL, client=client, stats=stats)
+    assert sqli._discover(points, boolean=True) == ({}, {})
+    assert client.requests == []
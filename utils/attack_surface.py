@@ -0,0 +1,165 @@
+"""
+Shared attack-surface extraction
+Parses each page once for forms, fields and links, and shares the result between scanners
+"""
+
+import hashlib
+import threading
+from urllib.parse import urljoin, urldefrag
+from colorama import Fore, Style
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Only these elements are kept when falling back to BeautifulSoup
+SURFACE_STRAINER = SoupStrainer(['form', 'a', 'base'])
+
+# Tag paths deeper than this do not contribute to the page skeleton
+SKELETON_DEPTH = 8
+
+
+class AttackSurface:
+    """Forms and links of the pages being scanned, parsed once per page
+    
+    Pages are fetched through the shared HTTP client (so its response cache
+    is reused) and parsed with lxml, or with BeautifulSoup restricted to
+    form/link elements when lxml is not installed. Form dictionaries keep the
+    layout the scanners already use ({'action', 'method', 'inputs'}) plus
+    'url', the action resolved against the page URL.
+    """
+    
+    def __init__(self, client):
+        self.client = client
+        self._pages = {}
+        self._lock = threading.Lock()
+    
+    def page(self, url):
+        """Return {'forms': [...], 'links': [...], 'skeleton': hash} for a page, fetching and parsing it once"""
+        with self._lock:
+            if url in self._pages:
+                return self._pages[url]
+        
+        surface = {'forms': [], 'links': [], 'skeleton': None}
+        try:
+            response = self.client.get(url, cache=True)
+            if response:
+                surface = self.parse(url, response.content)
+        except Exception as e:
+            print(f"{Fore.RED}[!] Error parsing forms: {str(e)}{Style.RESET_ALL}")
+        
+        with self._lock:
+            return self._pages.setdefault(url, surface)
+    
+    def remember(self, url, content):
+        """Parse a page body that was already fetched (e.g. by the crawler) and keep it"""
+        try:
+            surface = self.parse(url, content)
+        except Exception as e:
+            print(f"{Fore.RED}[!] Error parsing forms: {str(e)}{Style.RESET_ALL}")
+            surface = {'forms': [], 'links': [], 'skeleton': None}
+        with self._lock:
+            self._pages[url] = surface
+        return surface
+    
+    def restore(self, url, surface):
+        """Keep a page parsed in an earlier run (e.g. from a scan checkpoint)"""
+        with self._lock:
+            self._pages.setdefault(url, surface)
+    
+    def forms(self, url):
+        """Forms found on a page"""
+        return self.page(url)['forms']
+    
+    def links(self, url):
+        """Absolute link targets found on a page (fragments removed, de-duplicated)"""
+        return self.page(url)['links']
+    
+    @staticmethod
+    def parse(url, content):
+        """Extract forms and links from HTML content"""
+        if not content or not content.strip():
+            return {'forms': [], 'links': [], 'skeleton': None}
+        if lxml is not None:
+            return AttackSurface._parse_lxml(url, content)
+        return AttackSurface._parse_soup(url, content)
+    
+    @staticmethod
+    def _parse_lxml(url, content):
+        doc = lxml.html.document_fromstring(content)
+        base = doc.find('.//base[@href]')
+        base_url = urljoin(url, base.get('href').strip()) if base is not None else url
+        
+        forms = []
+        for form in doc.iter('form'):
+            inputs = [
+                {'type': field.get('type', 'text'), 'name': field.get('name')}
+                for field in form.iter('input', 'textarea', 'select')
+                if field.get('name')
+            ]
+            if inputs:
+                forms.append(AttackSurface._form(url, base_url, form.get('action', ''), form.get('method', 'get'), inputs))
+        
+        links = [anchor.get('href') for anchor in doc.iter('a') if anchor.get('href')]
+        paths = set()
+        for element in doc.iter():
+            if isinstance(element.tag, str):
+                chain = [element.tag] + [parent.tag for parent in element.iterancestors()]
+                paths.add('/'.join(reversed(chain[-SKELETON_DEPTH:])))
+        return {'forms': forms, 'links': AttackSurface._resolve_links(base_url, links),
+                'skeleton': AttackSurface._skeleton_hash(paths)}
+    
+    @staticmethod
+    def _parse_soup(url, content):
+        soup = BeautifulSoup(content, 'html.parser', parse_only=SURFACE_STRAINER)
+        base = soup.find('base', href=True)
+        base_url = urljoin(url, base['href'].strip()) if base is not None else url
+        
+        forms = []
+        for form in soup.find_all('form'):
+            inputs = [
+                {'type': field.get('type', 'text'), 'name': field.get('name')}
+                for field in form.find_all(['input', 'textarea', 'select'])
+                if field.get('name')
+            ]
+            if inputs:
+                forms.append(AttackSurface._form(url, base_url, form.get('action', ''), form.get('method', 'get'), inputs))
+        
+        links = [anchor['href'] for anchor in soup.find_all('a', href=True)]
+        paths = set()
+        for element in soup.find_all(True):
+            chain = [element.name] + [parent.name for parent in element.parents if parent.name != '[document]']
+            paths.add('/'.join(reversed(chain[-SKELETON_DEPTH:])))
+        return {'forms': forms, 'links': AttackSurface._resolve_links(base_url, links),
+                'skeleton': AttackSurface._skeleton_hash(paths)}
+    
+    @staticmethod
+    def _skeleton_hash(paths):
+        """Hash of the distinct tag paths of a page, ignoring text and repetition"""
+        digest = hashlib.blake2b('\n'.join(sorted(paths)).encode('utf-8'), digest_size=8)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _form(page_url, base_url, action, method, inputs):
+        """Form dictionary in the layout the scanners use"""
+        action = (action or '').strip()
+        return {
+            'action': action,
+            'method': (method or 'get').lower(),
+            # An empty action submits to the page itself, ignoring <base>
+            'url': urljoin(base_url, action) if action else page_url,
+            'inputs': inputs
+        }
+    
+    @staticmethod
+    def _resolve_links(page_url, hrefs):
+        """Resolve hrefs to absolute http(s) URLs without fragments"""
+        links = []
+        for href in hrefs:
+            link = urldefrag(urljoin(page_url, href.strip()))[0]
+            if link.startswith(('http://', 'https://')):
+                links.append(link)
+        return list(dict.fromkeys(links))
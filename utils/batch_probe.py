@@ -0,0 +1,135 @@
+"""
+Batched discovery probes across all parameters of one request
+"""
+
+from config import BATCH_PROBE_LENGTH_TOLERANCE
+
+
+class BatchProber:
+    """Probe every parameter of a URL or form at once and attribute the effect
+    
+    send(values, **kwargs) sends one request with a complete parameter dict.
+    Markers that can be told apart in the response (e.g. reflected canaries)
+    are attributed directly from a single request. Effects that cannot be
+    told apart (e.g. a SQL error) are located by group testing: a group
+    that shows the effect is split in halves until single parameters remain,
+    so k affected parameters out of n cost about 2k*log2(n) requests, and a
+    clean batch costs one (plus one baseline request).
+    
+    "No effect" only counts when the batched page still looks like the
+    baseline page (same status, similar length). One parameter that changes
+    the page (e.g. a validated numeric id answering "invalid id") would
+    otherwise hide the effect of all the others, so such batches are split
+    further, and parameters the batch cannot settle are left to the caller
+    to probe one by one.
+    """
+    
+    def __init__(self, send, base, tolerance=BATCH_PROBE_LENGTH_TOLERANCE):
+        self.send = send
+        self.base = dict(base)
+        self.tolerance = tolerance
+        self.requests = 0
+        self._baseline = None
+        self._has_baseline = False
+    
+    def values(self, probes):
+        """Base parameter values with some parameters replaced by probes"""
+        values = self.base.copy()
+        values.update(probes)
+        return values
+    
+    def send_probes(self, probes, **kwargs):
+        """Send one request with probes placed in their parameters"""
+        self.requests += 1
+        return self.send(self.values(probes), **kwargs)
+    
+    def baseline(self):
+        """Response to the unmodified parameters, fetched once"""
+        if not self._has_baseline:
+            self._baseline = self.send_probes({})
+            self._has_baseline = True
+        return self._baseline
+    
+    def changed(self, response, markers=()):
+        """True when a probe response cannot be compared with the baseline page
+        
+        That is when either request failed, the status differs, or the body
+        length (with the given markers removed) moved by more than the
+        tolerance.
+        """
+        baseline = self.baseline()
+        if response is None or baseline is None:
+            return True
+        if response.status_code != baseline.status_code:
+            return True
+        content = response.content
+        for marker in markers:
+            content = content.replace(marker.encode('utf-8'), b'')
+        return abs(len(content) - len(baseline.content)) > self.tolerance
+    
+    def attribute(self, names, make_marker, locate):
+        """Send a distinct marker in every parameter in a single request
+        
+        locate(response, marker) returns what one marker caused (falsy for
+        nothing). Returns {name: result} for the parameters the probe
+        settled. A marker that shows up always settles its parameter; one
+        that does not only settles it when the page did not change, and the
+        remaining parameters are otherwise attributed again in halves. A
+        lone parameter that still cannot be settled is left out.
+        """
+        names = list(names)
+        markers = {name: make_marker(name) for name in names}
+        response = self.send_probes(markers)
+        if response is None:
+            return {}
+        found = {name: locate(response, marker) for name, marker in markers.items()}
+        if not self.changed(response, markers.values()):
+            return found
+        
+        settled = {name: result for name, result in found.items() if result}
+        rest = [name for name in names if name not in settled]
+        if len(rest) > 1:
+            middle = len(rest) // 2
+            for half in (rest[:middle], rest[middle:]):
+                settled.update(self.attribute(half, make_marker, locate))
+        return settled
+    
+    def bisect(self, names, test):
+        """Find the parameters whose probe causes an effect
+        
+        test(group) probes every name in group at once and returns a result
+        (e.g. the response or evidence) if the effect shows, False if the
+        group is clean, and None if the outcome cannot be read (the request
+        failed, or the probes changed the page; see changed()). Results are
+        compared by identity, never by truth value: a requests.Response is
+        falsy for 4xx/5xx, which is what most SQL error pages answer with.
+        Returns {name: result} for the parameters it settled: the result for
+        those that cause the effect and False for clean ones. Parameters
+        left out could not be settled (a lone inconclusive one, or a group
+        whose effect only appears with several parameters combined) and
+        should be tested one by one.
+        """
+        names = list(names)
+        settled = {}
+        if names:
+            self._split(names, test(names), test, settled)
+        return settled
+    
+    def _split(self, group, result, test, settled):
+        """Settle a group from its test result, narrowing it down where needed"""
+        if result is False:
+            settled.update(dict.fromkeys(group, False))
+            return
+        if len(group) == 1:
+            if result is not None:
+                settled[group[0]] = result
+            return
+        
+        middle = len(group) // 2
+        for half in (group[:middle], group[middle:]):
+            self._split(half, test(half), test, settled)
+        
+        if result is not None and all(settled.get(name, False) is False for name in group):
+            # Positive as a whole but in no part on its own: interaction
+            for name in group:
+                settled.pop(name, None)
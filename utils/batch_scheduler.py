@@ -0,0 +1,103 @@
+"""
+Multi-target batch scheduling
+Per-host target queues served round-robin under a global concurrency budget
+"""
+
+import sys
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+from config import BATCH_PER_HOST
+
+
+def read_targets(source):
+    """Target URLs from a file ('-' for stdin), one per line; blank lines and # comments are skipped"""
+    stream = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        targets = []
+        for line in stream:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if '://' not in line:
+                line = f"http://{line}"
+            targets.append(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return list(dict.fromkeys(targets))
+
+
+class HostRoundRobin:
+    """Hand out targets one host at a time in rotation
+    
+    Every host has its own queue. Workers take the next target from the
+    next host in the ring that has fewer than per_host targets running, so
+    a host with many targets, or one that is slow, only ever holds its
+    share of the workers while the other hosts keep moving.
+    """
+    
+    def __init__(self, targets, per_host=BATCH_PER_HOST):
+        self.per_host = max(1, per_host)
+        self.total = len(targets)
+        self._queues = {}
+        for index, url in enumerate(targets):
+            self._queues.setdefault(urlparse(url).netloc.lower(), deque()).append((index, url))
+        self._ring = deque(self._queues)
+        self._active = {host: 0 for host in self._queues}
+        self._cond = threading.Condition()
+    
+    @property
+    def hosts(self):
+        return len(self._queues)
+    
+    def next(self):
+        """Block until a target may start; return (host, index, url), or None when all were handed out"""
+        with self._cond:
+            while True:
+                if not any(self._queues.values()):
+                    return None
+                for _ in range(len(self._ring)):
+                    host = self._ring[0]
+                    self._ring.rotate(-1)
+                    if self._queues[host] and self._active[host] < self.per_host:
+                        self._active[host] += 1
+                        index, url = self._queues[host].popleft()
+                        return host, index, url
+                # Every host with work left is at its share; wait for one to finish
+                self._cond.wait()
+    
+    def done(self, host):
+        with self._cond:
+            self._active[host] -= 1
+            self._cond.notify_all()
+    
+    def run(self, scan, workers):
+        """Run scan(index, url) for every target on up to workers threads
+        
+        Returns [(url, result, error)] in input order; an exception from one
+        target is kept as its error and does not stop the others.
+        """
+        outcomes = [None] * self.total
+        
+        def worker():
+            while True:
+                item = self.next()
+                if item is None:
+                    return
+                host, index, url = item
+                try:
+                    outcomes[index] = (url, scan(index, url), None)
+                except Exception as e:
+                    outcomes[index] = (url, None, e)
+                finally:
+                    self.done(host)
+        
+        threads = [threading.Thread(target=worker, name=f'batch-{i}', daemon=True)
+                   for i in range(max(1, min(workers, self.total)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
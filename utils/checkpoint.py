@@ -0,0 +1,153 @@
+"""
+Scan checkpoints
+Append-only JSON-lines record of a scan's progress so an interrupted scan can be resumed
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from config import CHECKPOINT_DIR, CHECKPOINT_FLUSH_RECORDS, CHECKPOINT_FLUSH_INTERVAL
+
+
+class CheckpointState:
+    """Progress rebuilt from a checkpoint file
+    
+    options: the scan's command-line options
+    pages: {url: attack surface} of every target found, in discovery order
+    done: targets already scanned or skipped, in order
+    finished: {(owner, point key)} injection points fully tested
+    findings: vulnerabilities reported so far
+    """
+    
+    def __init__(self):
+        self.options = {}
+        self.pages = {}
+        self.done = []
+        self.finished = set()
+        self.findings = []
+        self.complete = False
+    
+    @property
+    def pending(self):
+        """Targets found but not finished when the scan stopped"""
+        done = set(self.done)
+        return [url for url in self.pages if url not in done]
+
+
+class Checkpoint:
+    """Buffered append-only progress log of one scan
+    
+    Records are kept in memory and written in batches (every
+    CHECKPOINT_FLUSH_RECORDS records or CHECKPOINT_FLUSH_INTERVAL seconds,
+    and on close), so scanner threads never wait on the disk. A crash loses
+    at most the last unwritten batch; a truncated last line is ignored on
+    load.
+    """
+    
+    def __init__(self, path, flush_records=CHECKPOINT_FLUSH_RECORDS, flush_interval=CHECKPOINT_FLUSH_INTERVAL):
+        self.path = path
+        self.scan_id = os.path.splitext(os.path.basename(path))[0]
+        self.flush_records = max(1, flush_records)
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = None
+    
+    @classmethod
+    def create(cls, directory=CHECKPOINT_DIR):
+        """New checkpoint file for a scan starting now"""
+        os.makedirs(directory, exist_ok=True)
+        scan_id = f"scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        path = os.path.join(directory, f"{scan_id}.jsonl")
+        suffix = 1
+        while True:
+            try:
+                # Exclusive create: batch scans start several checkpoints in the same second
+                open(path, 'x').close()
+                return cls(path)
+            except FileExistsError:
+                suffix += 1
+                path = os.path.join(directory, f"{scan_id}_{suffix}.jsonl")
+    
+    @classmethod
+    def find(cls, scan, directory=CHECKPOINT_DIR):
+        """Existing checkpoint given a file path or a scan ID"""
+        for path in (scan, os.path.join(directory, scan), os.path.join(directory, f"{scan}.jsonl")):
+            if os.path.isfile(path):
+                return cls(path)
+        raise FileNotFoundError(f"No checkpoint found for '{scan}'")
+    
+    def record(self, kind, **fields):
+        """Queue one progress record, writing the batch when it is due"""
+        fields['type'] = kind
+        line = json.dumps(fields, default=str)
+        with self._lock:
+            self._buffer.append(line)
+            if (len(self._buffer) >= self.flush_records
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._write()
+    
+    def flush(self):
+        with self._lock:
+            self._write()
+    
+    def _write(self):
+        """Append buffered records in one write (lock held)"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._file = open(self.path, 'a+', encoding='utf-8')
+            if self._file.tell():
+                # Terminate a line cut short by a crash so new records start clean
+                self._file.seek(self._file.tell() - 1)
+                if self._file.read(1) != '\n':
+                    self._file.write('\n')
+        self._file.write('\n'.join(self._buffer) + '\n')
+        self._file.flush()
+        self._buffer = []
+    
+    def close(self):
+        with self._lock:
+            self._write()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def load(self):
+        """Rebuild the scan's progress from the records on disk"""
+        self.flush()
+        state = CheckpointState()
+        findings = {}
+        if not os.path.exists(self.path):
+            return state
+        
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Last line cut short by a crash
+                    continue
+                kind = entry.get('type')
+                if kind == 'scan':
+                    state.options = entry['options']
+                elif kind == 'page':
+                    state.pages.setdefault(entry['url'], entry['surface'])
+                elif kind == 'target':
+                    state.done.append(entry['url'])
+                elif kind == 'point':
+                    state.finished.add((entry['owner'], tuple(entry['key'])))
+                elif kind == 'finding':
+                    finding = entry['finding']
+                    # A point interrupted after reporting is tested (and reported) again
+                    key = (finding['type'], finding['parameter'], finding['method'], finding['url'])
+                    findings.setdefault(key, finding)
+                elif kind == 'end':
+                    state.complete = True
+        state.findings = list(findings.values())
+        return state
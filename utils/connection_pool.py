@@ -0,0 +1,88 @@
+"""
+Connection pool manager shared by all scanners in a run
+"""
+
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+
+from config import TIMEOUT, USER_AGENT, MAX_THREADS, HTTP_MAX_IN_FLIGHT, POOL_MAX_HOSTS
+
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+
+class ConnectionPoolManager:
+    """Per-host connection pools shared across threads, with one session per worker thread
+    
+    requests.Session is not thread-safe, so every thread gets its own
+    session. All of them mount the same HTTPAdapter (whose urllib3 pools are
+    thread-safe) and share one cookie jar, so sockets and login state are
+    reused across workers and across scanners. Sessions are only held
+    weakly outside their thread, so the ones of finished threads (short
+    lived pools, crawler workers) are freed with the thread.
+    """
+    
+    def __init__(self, pool_size=None, max_hosts=POOL_MAX_HOSTS):
+        # Pool size per host follows the concurrency settings
+        self.pool_size = pool_size or max(MAX_THREADS, HTTP_MAX_IN_FLIGHT)
+        self.adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=self.pool_size)
+        self.cookies = RequestsCookieJar()
+        self.headers = dict(DEFAULT_HEADERS)
+        self._local = threading.local()
+        self._sessions = weakref.WeakSet()  # Live threads' sessions, closed by close()
+        self._lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """Session bound to the calling thread"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.cookies = self.cookies
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.add(session)
+        return session
+    
+    def warm_up(self, url, connections=None, timeout=TIMEOUT):
+        """Open connections to the target host before the first payload is sent
+        
+        Sends concurrent HEAD requests so TCP/TLS handshakes are done up front
+        and the sockets are parked in the shared pool. Returns the number of
+        successful requests.
+        """
+        parsed = urlparse(url)
+        base_url = f"{parsed.scheme}://{parsed.netloc}/"
+        connections = connections or self.pool_size
+        
+        def _head(_):
+            try:
+                self.session.head(base_url, timeout=timeout, allow_redirects=False, verify=False)
+                return True
+            except requests.RequestException:
+                return False
+        
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(_head, range(connections)))
+    
+    def close(self):
+        """Close all sessions and the pooled connections"""
+        with self._lock:
+            for session in list(self._sessions):
+                session.close()
+            self._sessions = weakref.WeakSet()
+        self.adapter.close()
@@ -0,0 +1,286 @@
+"""
+Concurrent crawler
+Follows links and form actions within scope and streams pages with injection points to the scanners
+"""
+
+import hashlib
+import json
+import math
+import queue
+import re
+import tempfile
+import threading
+from collections import deque
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from colorama import Fore, Style
+
+from utils.stream_detector import ContentTypeDetector
+from config import (CRAWL_MAX_DEPTH, CRAWL_MAX_PAGES, CRAWL_WORKERS, CRAWL_FRONTIER_MEMORY,
+                    CRAWL_BLOOM_ERROR_RATE, CRAWL_EXCLUDE, CRAWL_SKIP_EXTENSIONS)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize(url):
+    """Normalise a URL so equivalent spellings map to one frontier entry
+    
+    Lower-cases scheme and host, drops default ports and the fragment,
+    uses '/' for an empty path and sorts query parameters.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, host, parsed.path or '/', parsed.params, query, ''))
+
+
+class BloomFilter:
+    """Fixed-size set membership with a bounded false-positive rate
+    
+    Used as the visited-URL index so memory stays constant however many
+    URLs are seen. A false positive only means a page is not crawled.
+    """
+    
+    def __init__(self, capacity, error_rate=CRAWL_BLOOM_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+    
+    def add(self, item):
+        """Add an item; return True if it was (probably) already present"""
+        present = True
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                present = False
+                self.bits[byte] |= 1 << bit
+        return present
+    
+    def __contains__(self, item):
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+
+class ScopeRules:
+    """Compiled include/exclude rules deciding which URLs are crawled
+    
+    Include and exclude patterns are regular expressions joined into one
+    compiled alternation each. Without include patterns only the start
+    URL's hosts are in scope.
+    """
+    
+    def __init__(self, hosts, include=None, exclude=CRAWL_EXCLUDE, skip_extensions=CRAWL_SKIP_EXTENSIONS):
+        self.hosts = {host.lower() for host in hosts}
+        self.include = self._compile(include)
+        self.exclude = self._compile(exclude)
+        self.skip_extensions = tuple(ext.lower() for ext in skip_extensions)
+    
+    @staticmethod
+    def _compile(patterns):
+        if not patterns:
+            return None
+        return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+    
+    def allows(self, url):
+        """True if a canonical URL may be crawled"""
+        parsed = urlparse(url)
+        if parsed.scheme not in DEFAULT_PORTS:
+            return False
+        if parsed.path.lower().endswith(self.skip_extensions):
+            return False
+        if self.exclude is not None and self.exclude.search(url):
+            return False
+        if self.include is not None:
+            return self.include.search(url) is not None
+        return parsed.netloc in self.hosts
+
+
+class Frontier:
+    """FIFO queue of (url, depth) that spills to a temporary file when large
+    
+    At most memory_limit entries are kept in memory; the rest are appended
+    to a JSON-lines file and read back in order once memory runs dry.
+    """
+    
+    def __init__(self, memory_limit=CRAWL_FRONTIER_MEMORY):
+        self.memory_limit = max(1, memory_limit)
+        self._memory = deque()
+        self._spill = None
+        self._spilled = 0
+        self._read_pos = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._memory) + self._spilled
+    
+    def push(self, url, depth):
+        with self._lock:
+            if self._spilled == 0 and len(self._memory) < self.memory_limit:
+                self._memory.append((url, depth))
+                return
+            if self._spill is None:
+                self._spill = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+            self._spill.seek(0, 2)
+            self._spill.write(json.dumps([url, depth]) + '\n')
+            self._spilled += 1
+    
+    def pop(self):
+        """Next (url, depth), or None when empty"""
+        with self._lock:
+            if not self._memory and self._spilled:
+                self._reload()
+            if not self._memory:
+                return None
+            return self._memory.popleft()
+    
+    def _reload(self):
+        """Move up to half the memory limit of spilled entries back into memory (lock held)"""
+        self._spill.flush()
+        self._spill.seek(self._read_pos)
+        for _ in range(min(self._spilled, max(1, self.memory_limit // 2))):
+            url, depth = json.loads(self._spill.readline())
+            self._memory.append((url, depth))
+            self._spilled -= 1
+        self._read_pos = self._spill.tell()
+        if not self._spilled:
+            self._spill.close()
+            self._spill = None
+            self._read_pos = 0
+    
+    def close(self):
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+
+
+class Crawler:
+    """Breadth-first concurrent crawler that yields pages worth scanning
+    
+    Workers fetch pages in parallel through the shared HTTP client. Non-HTML
+    responses are dropped after the headers or the first chunk. Every page
+    is parsed once into the shared AttackSurface, and pages that have query
+    parameters or forms are yielded as soon as they are found, so scanning
+    runs while the crawl continues.
+    """
+    
+    def __init__(self, client, surface, include=None, exclude=CRAWL_EXCLUDE,
+                 max_depth=CRAWL_MAX_DEPTH, max_pages=CRAWL_MAX_PAGES, workers=CRAWL_WORKERS):
+        self.client = client
+        self.surface = surface
+        self.include = include
+        self.exclude = exclude
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.workers = max(1, workers)
+        self.pages = 0
+        self._cond = threading.Condition()
+        self._active = 0
+        self._stopped = False
+    
+    def crawl(self, seed):
+        """Crawl from seed and yield canonical URLs of pages with injection points"""
+        seed = canonicalize(seed)
+        self.scope = ScopeRules([urlparse(seed).netloc], self.include, self.exclude)
+        self.visited = BloomFilter(max(self.max_pages, 1) * 20)
+        self.frontier = Frontier()
+        self.results = queue.Queue()
+        self.pages = 0
+        self._active = 0
+        self._stopped = False
+        
+        self.visited.add(seed)
+        self.frontier.push(seed, 0)
+        threads = [threading.Thread(target=self._worker, name=f'crawler-{i}', daemon=True)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        
+        finished = 0
+        try:
+            while finished < len(threads):
+                item = self.results.get()
+                if item is None:
+                    finished += 1
+                    continue
+                yield item
+        finally:
+            self.stop()
+            self.frontier.close()
+    
+    def stop(self):
+        """Stop handing out new pages"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+    
+    def _next(self):
+        """Block until a frontier entry is available, or return None when the crawl is over"""
+        with self._cond:
+            while True:
+                if self._stopped or self.pages >= self.max_pages:
+                    return None
+                item = self.frontier.pop()
+                if item is not None:
+                    self._active += 1
+                    self.pages += 1
+                    return item
+                if self._active == 0:
+                    # Nothing queued and nobody left who could queue more
+                    self._cond.notify_all()
+                    return None
+                self._cond.wait()
+    
+    def _worker(self):
+        try:
+            while True:
+                item = self._next()
+                if item is None:
+                    break
+                try:
+                    self._visit(*item)
+                except Exception as e:
+                    print(f"{Fore.RED}[!] Crawl error on {item[0]}: {str(e)}{Style.RESET_ALL}")
+                finally:
+                    with self._cond:
+                        self._active -= 1
+                        self._cond.notify_all()
+        finally:
+            self.results.put(None)
+    
+    def _visit(self, url, depth):
+        """Fetch one page, report it if it has injection points and queue its links"""
+        response = self.client.get(url, detector=ContentTypeDetector())
+        if not response or response.detected:
+            return
+        
+        surface = self.surface.remember(url, response.content)
+        if urlparse(url).query or surface['forms']:
+            self.results.put(url)
+        
+        if depth >= self.max_depth:
+            return
+        targets = list(surface['links'])
+        targets += [form['url'] for form in surface['forms'] if form['method'] == 'get']
+        queued = False
+        for target in targets:
+            target = canonicalize(target)
+            if self.scope.allows(target) and not self.visited.add(target):
+                self.frontier.push(target, depth + 1)
+                queued = True
+        if queued:
+            with self._cond:
+                self._cond.notify_all()
@@ -0,0 +1,196 @@
+"""
+Distributed scanning
+A coordinator queues (injection point, technique) jobs; worker processes lease, run and acknowledge them
+"""
+
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from colorama import Fore, Style
+
+from utils.work_queue import WorkQueue
+from utils.injection_points import InjectionPoint
+from utils.http_client import HTTPClient
+from utils.attack_surface import AttackSurface
+from scanners.sql_injection import SQLInjectionScanner
+from scanners.xss_scanner import XSSScanner
+from payloads.payload_stats import PayloadStats
+from config import WORK_POLL_INTERVAL
+
+# Scanner run for each scan type, and the form field types it leaves alone
+SCANNERS = {
+    'sqli': (SQLInjectionScanner, ('submit', 'button', 'hidden')),
+    'xss': (XSSScanner, ('submit', 'button')),
+}
+
+
+class Coordinator:
+    """Turns pages into queued jobs and collects what the workers found
+    
+    Each job is one injection point (URL, method, location, parameter) and
+    one technique of one scanner, so a slow time-based test on one point
+    does not hold up anything else. Points are claimed in the shared
+    InjectionPointRegistry, so a form seen on many pages is queued once.
+    """
+    
+    def __init__(self, queue, points, scan_type):
+        self.queue = queue
+        self.points = points
+        self.owners = ['sqli', 'xss'] if scan_type == 'all' else [scan_type]
+        # A restarted coordinator adds jobs again; wait() seals the queue once they are in
+        self.queue.unseal()
+    
+    def enqueue(self, url, page, template=None):
+        """Queue the jobs for a page's query parameters and forms; return how many were new"""
+        jobs = []
+        for owner in self.owners:
+            scanner, skip_types = SCANNERS[owner]
+            candidates = self.points.from_url(url)
+            for form in page['forms']:
+                candidates += self.points.from_form(form, skip_types=skip_types)
+            for point in candidates:
+                if not self.points.claim(point, owner):
+                    continue
+                for technique in scanner.techniques(point):
+                    key = json.dumps(list(point.key) + [owner, technique])
+                    jobs.append((key, {
+                        'scanner': owner,
+                        'technique': technique,
+                        'url': point.url,
+                        'method': point.method,
+                        'location': point.location,
+                        'name': point.name,
+                        'params': point.params,
+                        'template': template,
+                    }))
+        return self.queue.put(jobs) if jobs else 0
+    
+    def wait(self, interval=WORK_POLL_INTERVAL):
+        """Block until every job is done or failed, requeueing expired leases; return the final counts"""
+        self.queue.seal()
+        last = None
+        while True:
+            requeued = self.queue.requeue_expired()
+            if requeued:
+                print(f"{Fore.YELLOW}[!] Re-queued {requeued} job(s) whose worker stopped responding{Style.RESET_ALL}")
+            counts = self.queue.counts()
+            if counts != last:
+                print(f"{Fore.CYAN}[*] Jobs: {counts['done']} done, {counts['leased']} running, "
+                      f"{counts['queued']} queued, {counts['failed']} failed{Style.RESET_ALL}")
+                last = counts
+            if not counts['queued'] and not counts['leased']:
+                return counts
+            time.sleep(interval)
+    
+    def findings(self):
+        """Findings from all workers, one per (type, parameter, method, URL)"""
+        merged = {}
+        for finding in self.queue.findings():
+            key = (finding['type'], finding['parameter'], finding['method'], finding['url'])
+            merged.setdefault(key, finding)
+        return list(merged.values())
+
+
+class Worker:
+    """Leases jobs from a queue, runs them and acknowledges the findings
+    
+    A background thread renews the current job's lease, so a long job is
+    not handed to someone else while this worker is alive. The worker exits
+    once the coordinator has sealed the queue and nothing is left to run.
+    """
+    
+    def __init__(self, path, interval=WORK_POLL_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.jobs = 0
+    
+    def run(self):
+        queue = WorkQueue(self.path)
+        client = HTTPClient()
+        stats = PayloadStats()
+        surface = AttackSurface(client)
+        scanners = {}
+        print(f"{Fore.GREEN}[*] Worker {self.worker_id} polling {self.path}{Style.RESET_ALL}")
+        try:
+            while True:
+                leased = queue.lease(self.worker_id)
+                if leased is None:
+                    counts = queue.counts()
+                    if queue.sealed() and not counts['queued'] and not counts['leased']:
+                        break
+                    time.sleep(self.interval)
+                    continue
+                
+                job_id, job = leased
+                if job['scanner'] not in scanners:
+                    scanner = SCANNERS[job['scanner']][0]
+                    scanners[job['scanner']] = scanner(job['url'], client=client, stats=stats, surface=surface)
+                
+                stop = threading.Event()
+                heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, stop), daemon=True)
+                heartbeat.start()
+                try:
+                    findings = self._run(scanners[job['scanner']], job)
+                except Exception as e:
+                    print(f"{Fore.RED}[!] Job {job_id} failed: {str(e)}{Style.RESET_ALL}")
+                    queue.release(job_id, self.worker_id)
+                    continue
+                finally:
+                    stop.set()
+                    heartbeat.join()
+                
+                if not queue.ack(job_id, self.worker_id, findings):
+                    print(f"{Fore.YELLOW}[!] Lease on job {job_id} was lost, result dropped{Style.RESET_ALL}")
+                self.jobs += 1
+        finally:
+            stats.save()
+            client.close()
+            queue.close()
+        print(f"{Fore.GREEN}[*] Worker {self.worker_id} finished {self.jobs} job(s){Style.RESET_ALL}")
+    
+    @staticmethod
+    def _run(scanner, job):
+        """Run one job and return its findings tagged with the page template"""
+        point = InjectionPoint(job['url'], job['method'], job['location'], job['name'], job['params'])
+        print(f"{Fore.CYAN}[*] {job['scanner']}/{job['technique']}: {point.name} ({point.method} {point.url}){Style.RESET_ALL}")
+        findings = scanner.test_point(point, job['technique'])
+        for finding in findings:
+            finding['template'] = job['template']
+        return findings
+    
+    def _heartbeat(self, job_id, stop):
+        """Renew the lease on job_id until stop is set (own connection, own thread)"""
+        queue = WorkQueue(self.path)
+        try:
+            while not stop.wait(queue.lease_seconds / 3):
+                if not queue.renew(job_id, self.worker_id):
+                    break
+        finally:
+            queue.close()
+
+
+def _worker_main(path):
+    Worker(path).run()
+
+
+def start_workers(path, processes):
+    """Start local worker processes on a queue; return them"""
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=_worker_main, args=(path,), daemon=True) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def run_workers(path, processes=1):
+    """Run workers on a queue until the coordinator's jobs are done"""
+    if processes <= 1:
+        Worker(path).run()
+        return
+    workers = start_workers(path, processes)
+    for worker in workers:
+        worker.join()
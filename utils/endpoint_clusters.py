@@ -0,0 +1,118 @@
+"""
+Endpoint template clustering
+Groups pages with the same URL shape, parameters and page structure so only a few are scanned
+"""
+
+import re
+import threading
+from urllib.parse import urlparse, parse_qsl
+
+from config import TEMPLATE_REPRESENTATIVES
+
+# Path segments that vary between pages of one endpoint, most specific first
+SEGMENT_PATTERNS = [
+    (re.compile(r'^\d+$'), '{int}'),
+    (re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE), '{uuid}'),
+    (re.compile(r'^[0-9a-f]{16,}$', re.IGNORECASE), '{hex}'),
+    (re.compile(r'^(?=.*\d)[\w.-]{12,}$'), '{token}'),
+]
+
+
+def path_shape(path):
+    """Replace variable path segments with placeholders, e.g. /post/12 -> /post/{int}"""
+    segments = []
+    for segment in (path or '/').split('/'):
+        for pattern, placeholder in SEGMENT_PATTERNS:
+            if pattern.match(segment):
+                segment = placeholder
+                break
+        segments.append(segment)
+    return '/'.join(segments) or '/'
+
+
+class EndpointClusters:
+    """Cluster pages into endpoint templates and pick representatives to scan
+    
+    A template is keyed by the host, the path shape, the query parameter
+    names, the forms (method, action shape and field names) and the page's
+    skeleton hash from AttackSurface. Only the first few pages of each
+    template get the full payload battery; findings from them are merged
+    per template.
+    """
+    
+    def __init__(self, representatives=TEMPLATE_REPRESENTATIVES):
+        self.representatives = max(1, representatives)
+        self._members = {}  # key -> scanned URLs
+        self._labels = {}  # key -> printable template
+        self._skipped = {}  # label -> count of pages not scanned
+        self._lock = threading.Lock()
+    
+    def key(self, url, page):
+        """Template key of a page"""
+        parsed = urlparse(url)
+        names = tuple(sorted({name for name, _ in parse_qsl(parsed.query, keep_blank_values=True)}))
+        forms = tuple(sorted(
+            (form['method'], path_shape(urlparse(form['url']).path),
+             tuple(sorted({field['name'] for field in form['inputs']})))
+            for form in page.get('forms', [])
+        ))
+        return (parsed.netloc.lower(), path_shape(parsed.path), names, forms, page.get('skeleton'))
+    
+    def _label(self, key):
+        """Printable template such as host/post/{int}?id= (lock held)"""
+        netloc, shape, names, _, _ = key
+        label = f"{netloc}{shape}"
+        if names:
+            label += '?' + '&'.join(f"{name}=" for name in names)
+        taken = sum(1 for other in self._labels.values() if other.split(' (variant')[0] == label)
+        if taken:
+            label += f" (variant {taken + 1})"
+        return label
+    
+    def admit(self, url, page):
+        """Return (template label, True if this page should be scanned)"""
+        key = self.key(url, page)
+        with self._lock:
+            if key not in self._labels:
+                self._labels[key] = self._label(key)
+                self._members[key] = []
+            label = self._labels[key]
+            members = self._members[key]
+            if len(members) < self.representatives:
+                members.append(url)
+                return label, True
+            self._skipped[label] = self._skipped.get(label, 0) + 1
+            return label, False
+    
+    def skipped(self):
+        """{template label: pages skipped} for templates that had more pages than representatives"""
+        with self._lock:
+            return dict(self._skipped)
+    
+    @staticmethod
+    def endpoint(url):
+        """Host and path shape of the request a finding was made on (page URL or form action)"""
+        parsed = urlparse(url)
+        return (parsed.netloc.lower(), path_shape(parsed.path))
+    
+    @staticmethod
+    def merge(findings):
+        """Report each finding once per template and endpoint, listing every URL it was seen on
+        
+        The template is the scanned page's; the endpoint keeps findings for
+        different form actions on one page (e.g. 'username' on /login and
+        /register) apart.
+        """
+        merged = {}
+        for finding in findings:
+            template = finding.get('template')
+            if template is None:
+                merged[id(finding)] = finding
+                continue
+            key = (template, EndpointClusters.endpoint(finding['url']), finding['type'],
+                   finding['parameter'], finding['method'])
+            if key not in merged:
+                merged[key] = dict(finding, affected_urls=[])
+            if finding['url'] not in merged[key]['affected_urls']:
+                merged[key]['affected_urls'].append(finding['url'])
+        return list(merged.values())
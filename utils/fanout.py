@@ -0,0 +1,75 @@
+"""
+Parallel payload fan-out for a single injection point
+"""
+
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from config import MAX_THREADS
+
+
+class PayloadFanout:
+    """Send a payload batch concurrently and report the first hit in payload order
+    
+    Probes run on a shared executor (normally HTTPClient.workers), which
+    outlives the fan-out; at most max_workers of them are in flight at once.
+    """
+    
+    def __init__(self, executor, max_workers=MAX_THREADS):
+        self.executor = executor
+        self.max_workers = max(1, max_workers)
+    
+    def first_hit(self, payloads, probe, check):
+        """Run probe(payload) concurrently and return (payload, response) of the first hit
+        
+        check(payload, response) decides whether a response is a hit. The
+        result is always the hit with the lowest index in payloads, exactly as
+        a serial loop would report it; outstanding payloads after a hit are
+        cancelled. Returns (None, None) when nothing hits.
+        """
+        payloads = list(payloads)
+        if self.max_workers == 1:
+            for payload in payloads:
+                response = probe(payload)
+                if check(payload, response):
+                    return payload, response
+            return None, None
+        
+        futures = {}
+        pending = set()
+        best_index = None
+        best_response = None
+        next_index = 0
+        
+        # Keep at most max_workers probes queued so cancelled payloads are never sent
+        while True:
+            while next_index < len(payloads) and len(pending) < self.max_workers:
+                if best_index is not None and next_index > best_index:
+                    break
+                future = self.executor.submit(probe, payloads[next_index])
+                futures[future] = next_index
+                pending.add(future)
+                next_index += 1
+            
+            if not pending:
+                break
+            
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures.pop(future)
+                if future.cancelled():
+                    continue
+                response = future.result()
+                if (best_index is None or index < best_index) and check(payloads[index], response):
+                    best_index = index
+                    best_response = response
+            
+            if best_index is not None:
+                # Only probes before the current best can still change the answer
+                for future in list(pending):
+                    if futures[future] > best_index and future.cancel():
+                        pending.discard(future)
+                        futures.pop(future)
+        
+        if best_index is None:
+            return None, None
+        return payloads[best_index], best_response
@@ -0,0 +1,126 @@
+"""
+Endpoint fingerprints for incremental rescans
+Remembers how each scanned page looked and what was found, so unchanged pages are not retested
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+from config import FINGERPRINT_FILE
+
+# Page content that changes on every request without changing the attack surface
+VOLATILE_PATTERNS = [
+    (re.compile(rb'(<input[^>]*type=["\']?hidden[^>]*value=)(?:"[^"]*"|\'[^\']*\'|[^\s>]*)', re.IGNORECASE), rb'\1*'),
+    (re.compile(rb'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?'), b'*'),
+    (re.compile(rb'\b(?=[0-9a-zA-Z_-]*\d)[0-9a-zA-Z_-]{16,}\b'), b'*'),
+    (re.compile(rb'\b\d{9,}\b'), b'*'),
+]
+WHITESPACE = re.compile(rb'\s+')
+
+# Finding categories produced by each scan type
+SCAN_CATEGORIES = {
+    'sqli': {'SQL Injection'},
+    'xss': {'Cross-Site Scripting (XSS)'},
+}
+
+
+class EndpointFingerprints:
+    """Per-page fingerprints and findings kept between runs
+    
+    A page's fingerprint is its ETag and Last-Modified validators, a hash
+    of its form structure and a hash of its body with volatile content
+    (hidden field values, timestamps, long tokens) removed. On the next run
+    the page is fetched with If-None-Match / If-Modified-Since; a 304, or a
+    fresh response with the same form and body hashes, means the page is
+    unchanged and its previous findings are carried over.
+    """
+    
+    def __init__(self, path=FINGERPRINT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.pages = self._load()
+    
+    def _load(self):
+        """Read the fingerprint file, or start empty"""
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+    
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.pages, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+    
+    @staticmethod
+    def body_hash(content):
+        """Hash of a body with volatile content and whitespace normalised away"""
+        content = content or b''
+        for pattern, replacement in VOLATILE_PATTERNS:
+            content = pattern.sub(replacement, content)
+        content = WHITESPACE.sub(b' ', content)
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+    
+    @staticmethod
+    def form_hash(forms):
+        """Hash of the forms' methods, targets and field names and types"""
+        structure = sorted(
+            [form['method'], form['url'], sorted([field['type'], field['name']] for field in form['inputs'])]
+            for form in forms
+        )
+        return hashlib.blake2b(json.dumps(structure).encode('utf-8'), digest_size=16).hexdigest()
+    
+    def check(self, client, surface, url, scan_type):
+        """Fetch a page conditionally and compare it with the previous run
+        
+        Returns (previous findings, fingerprint): the findings are None when
+        the page must be scanned. A changed page is handed to surface so it
+        is not fetched again.
+        """
+        with self._lock:
+            previous = self.pages.get(url)
+        
+        headers = {}
+        if previous and previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous and previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+        response = client.get(url, headers=headers or None)
+        if response is None:
+            return None, None
+        
+        if response.status_code == 304 and previous:
+            fingerprint = {key: previous.get(key) for key in ('etag', 'last_modified', 'forms', 'body')}
+            fingerprint['etag'] = response.headers.get('ETag', fingerprint['etag'])
+        else:
+            page = surface.remember(url, response.content)
+            fingerprint = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'forms': self.form_hash(page['forms']),
+                'body': self.body_hash(response.content),
+            }
+            if not previous or (previous.get('forms'), previous.get('body')) != (fingerprint['forms'], fingerprint['body']):
+                return None, fingerprint
+        
+        if previous.get('type') not in (scan_type, 'all'):
+            return None, fingerprint
+        findings = previous.get('findings', [])
+        if scan_type != 'all':
+            findings = [f for f in findings if f.get('category') in SCAN_CATEGORIES[scan_type]]
+        return findings, fingerprint
+    
+    def update(self, url, fingerprint, scan_type, findings):
+        """Store a page's fingerprint and the findings of this run's scan type"""
+        if fingerprint is None:
+            return
+        with self._lock:
+            self.pages[url] = dict(fingerprint, type=scan_type, findings=list(findings))
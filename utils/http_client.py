@@ -2,51 +2,277 @@
 HTTP Client utility for making web requests
 """
 
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from urllib.parse import urljoin, urlparse, parse_qs, urlencode, urlunparse
-from config import TIMEOUT, USER_AGENT
+from config import (TIMEOUT, HTTP_MAX_IN_FLIGHT, MAX_RPS, MAX_BODY_SIZE, MAX_DECOMPRESSION_RATIO,
+                    STREAM_CHUNK_SIZE, STREAM_DRAIN_LIMIT, PAYLOAD_POOL_SIZE)
+from utils.connection_pool import ConnectionPoolManager
+from utils.request_cache import RequestCache
+from utils.rate_limiter import AdaptiveRateLimiter
+
+
+class AsyncEngine:
+    """Asyncio transport that runs blocking requests calls with a bounded in-flight limit"""
+    
+    def __init__(self, max_in_flight=HTTP_MAX_IN_FLIGHT):
+        self.max_in_flight = max(1, max_in_flight)
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_in_flight,
+                                           thread_name_prefix='http')
+        self.loop.set_default_executor(self.executor)
+        self._semaphore = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name='http-engine', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+    
+    def _run_loop(self):
+        """Run the event loop in the background thread"""
+        asyncio.set_event_loop(self.loop)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._ready.set()
+        self.loop.run_forever()
+    
+    async def call(self, func, *args, **kwargs):
+        """Run a blocking function in the executor once an in-flight slot is free
+        
+        Must run on the engine loop (see submit()); the semaphore and the
+        executor are bound to it.
+        """
+        async with self._semaphore:
+            return await self.loop.run_in_executor(None, lambda: func(*args, **kwargs))
+    
+    def submit(self, coro):
+        """Schedule a coroutine on the engine loop and return a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def run(self, coro):
+        """Run a coroutine on the engine loop and wait for its result"""
+        return self.submit(coro).result()
+    
+    def close(self):
+        """Stop the event loop and release worker threads"""
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.loop.close()
+
 
 class HTTPClient:
     """HTTP client wrapper with custom headers and error handling"""
     
-    def __init__(self, timeout=TIMEOUT):
+    def __init__(self, timeout=TIMEOUT, max_in_flight=HTTP_MAX_IN_FLIGHT, pool=None, max_rps=None,
+                 max_body_size=MAX_BODY_SIZE):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
-    
-    def get(self, url, params=None, allow_redirects=True):
-        """Send GET request"""
-        try:
-            response = self.session.get(
-                url,
-                params=params,
-                timeout=self.timeout,
-                allow_redirects=allow_redirects,
-                verify=False
+        self.max_body_size = max_body_size
+        self.max_in_flight = max_in_flight
+        self.pool = pool or ConnectionPoolManager()
+        self.cache = RequestCache()
+        self.limiter = AdaptiveRateLimiter(
+            max_rps=MAX_RPS if max_rps is None else max_rps,
+            max_concurrency=self.pool.pool_size
+        )
+        self.last_error = None
+        self._engine = None
+        self._workers = None
+        self._engine_lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """Session for the calling thread, backed by the shared connection pool"""
+        return self.pool.session
+    
+    @property
+    def engine(self):
+        """Lazily started asyncio engine shared by all async calls of this client"""
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    self._engine = AsyncEngine(self.max_in_flight)
+        return self._engine
+    
+    @property
+    def workers(self):
+        """Lazily started thread pool for payload fan-out, shared by every scanner using this client"""
+        if self._workers is None:
+            with self._engine_lock:
+                if self._workers is None:
+                    self._workers = ThreadPoolExecutor(max_workers=PAYLOAD_POOL_SIZE,
+                                                       thread_name_prefix='payload')
+        return self._workers
+    
+    def get(self, url, params=None, allow_redirects=True, cache=False, detector=None,
+            expect_delay=False, headers=None):
+        """Send GET request
+        
+        With cache=True, repeated requests for the same URL are served from the
+        request cache and identical concurrent requests are merged. Payload
+        probes should leave caching off. A detector (see utils.stream_detector)
+        is fed the body while it streams and stops the read once it matches;
+        such partial responses are never cached. expect_delay=True marks probes
+        that are meant to be slow so their latency is not read as congestion.
+        Extra headers (e.g. conditional request headers) are sent uncached.
+        """
+        if cache and detector is None and headers is None:
+            key = RequestCache.make_key('GET', url, params)
+            return self.cache.get_or_fetch(
+                key, lambda: self.get(url, params=params, allow_redirects=allow_redirects)
             )
-            return response
-        except requests.RequestException as e:
-            return None
+        
+        return self._request('GET', url, detector=detector, expect_delay=expect_delay,
+                             params=params, allow_redirects=allow_redirects, headers=headers)
     
-    def post(self, url, data=None, allow_redirects=True):
+    def post(self, url, data=None, allow_redirects=True, detector=None, expect_delay=False,
+             headers=None):
         """Send POST request"""
+        # POST may change server state, so cached pages of this host are stale
+        self.cache.invalidate_host(url)
+        return self._request('POST', url, detector=detector, expect_delay=expect_delay,
+                             data=data, allow_redirects=allow_redirects, headers=headers)
+    
+    def _request(self, method, url, detector=None, expect_delay=False, **kwargs):
+        """Send a request through the per-host rate limiter
+        
+        The limiter slot is always released; any failure (including one
+        raised while a detector reads the body) counts as an error.
+        """
+        self.limiter.acquire(url)
+        start_time = time.monotonic()
+        completed = False
         try:
-            response = self.session.post(
+            response = self.session.request(
+                method,
                 url,
-                data=data,
                 timeout=self.timeout,
-                allow_redirects=allow_redirects,
-                verify=False
+                verify=False,
+                stream=True,
+                **kwargs
             )
-            return response
+            self._read_body(response, detector)
+            completed = True
         except requests.RequestException as e:
+            # Connection errors and timeouts still return None, but they slow the host down
+            self.last_error = e
             return None
+        finally:
+            if completed:
+                self.limiter.release(
+                    url,
+                    latency=None if expect_delay else time.monotonic() - start_time,
+                    status=response.status_code,
+                    retry_after=self._retry_after(response)
+                )
+            else:
+                self.limiter.release(url, error=True)
+        
+        return response
+    
+    def _read_body(self, response, detector=None):
+        """Stream the body into response.content with early termination and size caps
+        
+        Sets response.detected when the detector stopped the read and
+        response.truncated when the body or decompression limit was hit.
+        """
+        response.detected = False
+        response.truncated = False
+        if detector is not None and detector.start(response):
+            response.detected = True
+            response._content = b''
+            response.close()
+            return
+        
+        chunks = []
+        size = 0
+        body = response.iter_content(STREAM_CHUNK_SIZE)
+        try:
+            for chunk in body:
+                size += len(chunk)
+                if size > self.max_body_size:
+                    chunks.append(chunk[:len(chunk) - (size - self.max_body_size)])
+                    response.truncated = True
+                    break
+                chunks.append(chunk)
+                
+                # Guard against compression bombs
+                raw_size = response.raw.tell()
+                if raw_size and size > STREAM_CHUNK_SIZE and size > raw_size * MAX_DECOMPRESSION_RATIO:
+                    response.truncated = True
+                    break
+                
+                if detector is not None and detector.feed(chunk):
+                    response.detected = True
+                    # Drain a small remainder so the connection can go back to the pool
+                    drained = 0
+                    for rest in body:
+                        drained += len(rest)
+                        if drained > STREAM_DRAIN_LIMIT:
+                            break
+                    break
+        finally:
+            response._content = b''.join(chunks)
+            response.close()
+    
+    @staticmethod
+    def _retry_after(response):
+        """Seconds from a Retry-After header, if present"""
+        value = response.headers.get('Retry-After')
+        if value and value.isdigit():
+            return int(value)
+        return None
+    
+    async def async_get(self, url, params=None, allow_redirects=True, cache=False):
+        """Send GET request through the asyncio engine (awaitable from any event loop)"""
+        return await asyncio.wrap_future(self.submit_get(url, params=params,
+                                                         allow_redirects=allow_redirects, cache=cache))
+    
+    async def async_post(self, url, data=None, allow_redirects=True):
+        """Send POST request through the asyncio engine (awaitable from any event loop)"""
+        return await asyncio.wrap_future(self.submit_post(url, data=data, allow_redirects=allow_redirects))
+    
+    def submit_get(self, url, params=None, allow_redirects=True, cache=False):
+        """Start GET request in the background and return a Future for the response"""
+        return self.engine.submit(self.engine.call(self.get, url, params=params,
+                                                   allow_redirects=allow_redirects, cache=cache))
+    
+    def submit_post(self, url, data=None, allow_redirects=True):
+        """Start POST request in the background and return a Future for the response"""
+        return self.engine.submit(self.engine.call(self.post, url, data=data,
+                                                   allow_redirects=allow_redirects))
+    
+    def gather(self, requests_list):
+        """Send several requests concurrently and return responses in the same order
+        
+        Each item is a (method, url, kwargs) tuple, e.g. ('GET', url, {'params': {...}}).
+        """
+        async def _gather():
+            # Runs on the engine loop, so the engine calls are awaited directly
+            calls = []
+            for method, url, kwargs in requests_list:
+                func = self.post if method.upper() == 'POST' else self.get
+                calls.append(self.engine.call(func, url, **kwargs))
+            return await asyncio.gather(*calls)
+        
+        return self.engine.run(_gather())
+    
+    def warm_up(self, url):
+        """Pre-open pooled connections to the host of url"""
+        return self.pool.warm_up(url, timeout=self.timeout)
+    
+    def close(self):
+        """Shut down the asyncio engine and payload workers and close pooled connections"""
+        if self._engine is not None:
+            self._engine.close()
+            self._engine = None
+        if self._workers is not None:
+            self._workers.shutdown(wait=False, cancel_futures=True)
+            self._workers = None
+        self.pool.close()
     
     @staticmethod
     def parse_url(url):
@@ -0,0 +1,146 @@
+"""
+Injection-point registry
+Identifies every tested parameter by (URL, method, location, name) and keeps a precompiled request template for it
+"""
+
+import threading
+from urllib.parse import urlparse, urlunparse, urlencode, quote_plus, parse_qsl
+
+FORM_CONTENT_TYPE = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+
+def split_url(url):
+    """Return the URL without its query string and fragment"""
+    parsed = urlparse(url)
+    return urlunparse((parsed.scheme, parsed.netloc, parsed.path, parsed.params, '', ''))
+
+
+def send_values(client, method, url, values, **kwargs):
+    """Send one request with a complete parameter dict (query string for GET, form body otherwise)"""
+    if method == 'GET':
+        query = urlencode(values)
+        return client.get(f"{url}?{query}" if query else url, **kwargs)
+    return client.post(url, data=values, **kwargs)
+
+
+class InjectionPoint:
+    """One parameter of one request, with the rest of the request encoded once
+    
+    The other parameters are URL-encoded when the point is created and kept
+    as a prefix and suffix around the payload slot, so building a probe is
+    one quote_plus() and a string concatenation.
+    """
+    
+    def __init__(self, url, method, location, name, params):
+        self.url = url
+        self.method = method
+        self.location = location
+        self.name = name
+        self.params = dict(params)
+        self.value = self.params.get(name, '')
+        
+        names = list(self.params)
+        position = names.index(name) if name in self.params else len(names)
+        before = urlencode([(n, self.params[n]) for n in names[:position]])
+        after = urlencode([(n, self.params[n]) for n in names[position + 1:]])
+        self._prefix = (before + '&' if before else '') + quote_plus(name) + '='
+        self._suffix = '&' + after if after else ''
+    
+    @property
+    def key(self):
+        return (self.url, self.method, self.location, self.name)
+    
+    @property
+    def target_url(self):
+        """URL reported for findings: the original request URL"""
+        if self.location == 'query':
+            return f"{self.url}?{self.render(self.value)}"
+        return self.url
+    
+    def render(self, payload):
+        """Encoded query string or form body with the payload in this point's slot"""
+        return self._prefix + quote_plus(payload) + self._suffix
+    
+    def send(self, client, payload, **kwargs):
+        """Send the request with the payload in this point's slot"""
+        if self.location == 'query':
+            return client.get(f"{self.url}?{self.render(payload)}", **kwargs)
+        return client.post(self.url, data=self.render(payload), headers=FORM_CONTENT_TYPE, **kwargs)
+    
+    def with_payload(self, payload):
+        """Parameter dict with the payload in this point's slot"""
+        values = self.params.copy()
+        values[self.name] = payload
+        return values
+
+
+class InjectionPointRegistry:
+    """All injection points of a scan, keyed by (URL, method, location, name)
+    
+    Points are created once and shared, so a 'username' field in one form no
+    longer hides a 'username' field elsewhere. claim() records which scanner
+    has tested a point, so the same point found again (e.g. a login form on
+    every crawled page) is only tested once per scanner.
+    """
+    
+    def __init__(self, checkpoint=None):
+        self._points = {}
+        self._claims = set()
+        self._lock = threading.Lock()
+        self.checkpoint = checkpoint
+    
+    def add(self, url, method, location, name, params):
+        """Return the injection point for this request parameter, creating it once"""
+        method = method.upper()
+        key = (url, method, location, name)
+        with self._lock:
+            point = self._points.get(key)
+            if point is None:
+                point = InjectionPoint(url, method, location, name, params)
+                self._points[key] = point
+            return point
+    
+    def from_url(self, url):
+        """Injection points for the query parameters of a URL"""
+        base = split_url(url)
+        params = {}
+        for name, value in parse_qsl(urlparse(url).query, keep_blank_values=True):
+            params.setdefault(name, value)
+        return [self.add(base, 'GET', 'query', name, params) for name in params]
+    
+    def from_form(self, form, skip_types=('submit', 'button')):
+        """Injection points for the fields of a form, honouring its method
+        
+        GET forms put their fields in the query string of the action URL
+        (replacing any query it had); other methods send a form body.
+        """
+        method = 'GET' if form['method'] == 'get' else 'POST'
+        location = 'query' if method == 'GET' else 'body'
+        url = split_url(form['url']) if method == 'GET' else form['url']
+        params = {}
+        for field in form['inputs']:
+            params.setdefault(field['name'], 'test')
+        names = [field['name'] for field in form['inputs'] if field['type'] not in skip_types]
+        return [self.add(url, method, location, name, params) for name in dict.fromkeys(names)]
+    
+    def claim(self, point, owner):
+        """Mark point as tested by owner; False if it already was"""
+        with self._lock:
+            if (point.key, owner) in self._claims:
+                return False
+            self._claims.add((point.key, owner))
+            return True
+    
+    def finish(self, point, owner):
+        """Record that owner has fully tested point, so a resumed scan skips it"""
+        if self.checkpoint is not None:
+            self.checkpoint.record('point', owner=owner, key=list(point.key))
+    
+    def restore(self, finished):
+        """Mark (owner, point key) pairs from a checkpoint as already tested"""
+        with self._lock:
+            self._claims.update((tuple(key), owner) for owner, key in finished)
+    
+    def __len__(self):
+        return len(self._points)
+
@@ -0,0 +1,137 @@
+"""
+Adaptive per-host rate limiter with AIMD concurrency control
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+from config import (MAX_RPS, MAX_THREADS, HTTP_MAX_IN_FLIGHT, AIMD_INITIAL_CONCURRENCY,
+                    AIMD_LATENCY_FACTOR, AIMD_DECREASE_FACTOR)
+
+# Status codes that mean the target is asking us to slow down
+BACKOFF_STATUS_CODES = (429, 503)
+
+# Latency rises smaller than this (seconds) are treated as jitter, not congestion
+LATENCY_SLACK = 0.05
+
+
+class _HostState:
+    """Token bucket and congestion window for one host"""
+    
+    def __init__(self, max_rps, limit):
+        self.rate = max_rps
+        self.capacity = max(1.0, float(max_rps))
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.limit = float(limit)
+        self.in_flight = 0
+        self.base_latency = None  # lowest smoothed latency seen
+        self.avg_latency = None
+        self.last_decrease = 0.0
+        self.paused_until = 0.0
+    
+    def refill(self, now):
+        """Add the tokens accrued since the last refill"""
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+
+class AdaptiveRateLimiter:
+    """Per-host token bucket (max requests/second) combined with AIMD concurrency
+    
+    Each host gets a congestion window that grows by one slot per window of
+    successful responses and is cut multiplicatively on 429/503 responses,
+    connection errors or latency rising well above the host's baseline.
+    """
+    
+    def __init__(self, max_rps=MAX_RPS, max_concurrency=None, min_concurrency=1,
+                 initial_concurrency=AIMD_INITIAL_CONCURRENCY):
+        self.max_rps = max_rps or 0
+        self.max_concurrency = max_concurrency or max(MAX_THREADS, HTTP_MAX_IN_FLIGHT)
+        self.min_concurrency = min_concurrency
+        self.initial_concurrency = min(initial_concurrency, self.max_concurrency)
+        self._hosts = {}
+        self._cond = threading.Condition()
+    
+    @staticmethod
+    def _host(url):
+        return urlparse(url).netloc
+    
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(self.max_rps, self.initial_concurrency)
+            self._hosts[host] = state
+        return state
+    
+    def acquire(self, url):
+        """Block until the host has a free concurrency slot and a rate token"""
+        host = self._host(url)
+        with self._cond:
+            while True:
+                state = self._state(host)
+                now = time.monotonic()
+                state.refill(now)
+                wait_for = None
+                if now < state.paused_until:
+                    wait_for = state.paused_until - now
+                elif state.in_flight >= int(state.limit):
+                    wait_for = None  # woken by release()
+                elif state.rate > 0 and state.tokens < 1:
+                    wait_for = (1 - state.tokens) / state.rate
+                else:
+                    if state.rate > 0:
+                        state.tokens -= 1
+                    state.in_flight += 1
+                    return
+                self._cond.wait(wait_for)
+    
+    def release(self, url, latency=None, status=None, error=False, retry_after=None):
+        """Return the slot and adjust the host's window from the outcome
+        
+        latency may be None for requests whose duration is expected to be
+        unusual (e.g. injected delays) so they do not skew the baseline.
+        """
+        host = self._host(url)
+        with self._cond:
+            state = self._state(host)
+            state.in_flight = max(0, state.in_flight - 1)
+            now = time.monotonic()
+            
+            congested = error or status in BACKOFF_STATUS_CODES
+            if latency is not None and not congested:
+                if state.avg_latency is None:
+                    state.avg_latency = latency
+                else:
+                    state.avg_latency = 0.8 * state.avg_latency + 0.2 * latency
+                if state.base_latency is None or state.avg_latency < state.base_latency:
+                    state.base_latency = state.avg_latency
+                congested = (state.avg_latency > state.base_latency * AIMD_LATENCY_FACTOR
+                             and state.avg_latency - state.base_latency > LATENCY_SLACK)
+            
+            if congested:
+                # Multiplicative decrease, at most once per smoothed round trip
+                cooldown = state.avg_latency or 1.0
+                if now - state.last_decrease >= cooldown:
+                    state.limit = max(self.min_concurrency, state.limit * AIMD_DECREASE_FACTOR)
+                    state.last_decrease = now
+                if retry_after:
+                    state.paused_until = max(state.paused_until, now + retry_after)
+            else:
+                # Additive increase: about one extra slot per full window of successes
+                state.limit = min(self.max_concurrency, state.limit + 1.0 / state.limit)
+            
+            self._cond.notify_all()
+    
+    def stats(self, url):
+        """Current window, in-flight count and smoothed latency for the host of url"""
+        with self._cond:
+            state = self._state(self._host(url))
+            return {
+                'limit': state.limit,
+                'in_flight': state.in_flight,
+                'avg_latency': state.avg_latency,
+                'base_latency': state.base_latency,
+            }
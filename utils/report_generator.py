@@ -406,6 +406,13 @@ class ReportGenerator:
                             <span class="vuln-detail-value">{{ vuln.url }}</span>
                         </div>
 
+                        {% if vuln.template %}
+                        <div class="vuln-detail">
+                            <span class="vuln-detail-label">🧩 Template:</span>
+                            <span class="vuln-detail-value">{{ vuln.template }} ({{ vuln.affected_urls|length }} URL(s))</span>
+                        </div>
+                        {% endif %}
+
                         <div class="vuln-detail">
                             <span class="vuln-detail-label">📌 Parameter:</span>
                             <span class="vuln-detail-value">{{ vuln.parameter }}</span>
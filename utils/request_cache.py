@@ -0,0 +1,103 @@
+"""
+Request memoization cache with single-flight de-duplication
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode, urlparse
+
+from config import REQUEST_CACHE_SIZE, REQUEST_CACHE_TTL
+
+
+class _InFlight:
+    """A request currently being fetched on behalf of every caller with the same key"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+
+
+class RequestCache:
+    """LRU/TTL response cache that merges identical in-flight requests"""
+    
+    def __init__(self, max_entries=REQUEST_CACHE_SIZE, ttl=REQUEST_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, response)
+        self._inflight = {}
+        self._generation = 0  # bumped on invalidation so stale in-flight results are not stored
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(method, url, params=None, data=None):
+        """Build a cache key from method, URL and body"""
+        if isinstance(params, dict):
+            params = urlencode(sorted(params.items()), doseq=True)
+        if isinstance(data, dict):
+            data = urlencode(sorted(data.items()), doseq=True)
+        return (method.upper(), url, params or '', data or '')
+    
+    def get_or_fetch(self, key, fetch):
+        """Return the cached response for key, calling fetch() at most once per key
+        
+        Concurrent callers asking for the same key while it is being fetched
+        wait for that single request instead of sending their own. Failed
+        fetches (None) are handed to the waiting callers but not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+            
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                generation = self._generation
+                call = _InFlight()
+                self._inflight[key] = call
+                self.misses += 1
+            else:
+                self.hits += 1
+        
+        if not leader:
+            call.done.wait()
+            return call.response
+        
+        try:
+            call.response = fetch()
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if call.response is not None and generation == self._generation:
+                    self._store(key, call.response)
+            call.done.set()
+        return call.response
+    
+    def _store(self, key, response):
+        """Insert a response and evict the least recently used entries (lock held)"""
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate_host(self, url):
+        """Drop cached responses for the host of url after a state-changing request"""
+        netloc = urlparse(url).netloc
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._entries if urlparse(k[1]).netloc == netloc]:
+                del self._entries[key]
+    
+    def clear(self):
+        """Drop all cached responses"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
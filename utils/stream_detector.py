@@ -0,0 +1,72 @@
+"""
+Detectors fed with response body chunks while the body is streamed
+"""
+
+
+class StreamDetector:
+    """Base detector: feed() body chunks until it reports a decision"""
+    
+    def __init__(self):
+        self.matched = False
+    
+    def start(self, response):
+        """Inspect the response headers before the body is read; return True to skip the body"""
+        return False
+    
+    def feed(self, chunk):
+        """Consume a chunk of body bytes; return True once no more data is needed"""
+        return False
+
+
+class MatcherDetector(StreamDetector):
+    """Feeds chunks to a SignatureMatcher-like object (search() and overlap)"""
+    
+    def __init__(self, matcher):
+        super().__init__()
+        self.matcher = matcher
+        self._tail = b''
+        self.match = None
+    
+    def feed(self, chunk):
+        """Search the chunk plus the tail of the previous one in a single pass"""
+        window = self._tail + chunk
+        match = self.matcher.search(window)
+        if match is not None:
+            self.matched = True
+            self.match = match
+            return True
+        self._tail = window[-self.matcher.overlap:] if self.matcher.overlap else b''
+        return False
+
+
+class ContentTypeDetector(StreamDetector):
+    """Stops the read as soon as the response turns out not to be HTML
+    
+    The Content-Type header is checked before any body is read, and the
+    first chunk is sniffed for binary data, so archives, images and other
+    downloads cost one chunk at most. matched is True for non-HTML bodies.
+    """
+    
+    HTML_TYPES = ('text/html', 'application/xhtml+xml')
+    BINARY_MAGIC = (b'PK\x03\x04', b'%PDF', b'\x89PNG', b'GIF8', b'\xff\xd8\xff', b'\x1f\x8b', b'Rar!', b'7z\xbc\xaf')
+    
+    def __init__(self):
+        super().__init__()
+        self._sniffed = False
+    
+    def start(self, response):
+        """Skip bodies whose declared type is not HTML"""
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type and content_type not in self.HTML_TYPES:
+            self.matched = True
+        return self.matched
+    
+    def feed(self, chunk):
+        """Sniff the first chunk for binary signatures or NUL bytes"""
+        if self._sniffed:
+            return False
+        self._sniffed = True
+        head = chunk[:512]
+        if head.startswith(self.BINARY_MAGIC) or b'\x00' in head:
+            self.matched = True
+        return self.matched
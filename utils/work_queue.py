@@ -0,0 +1,178 @@
+"""
+Durable work queue for distributed scans
+SQLite-backed job queue with leases, shared by a coordinator and its worker processes
+"""
+
+import json
+import sqlite3
+import time
+
+from config import WORK_LEASE_SECONDS, WORK_MAX_ATTEMPTS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT UNIQUE NOT NULL,
+    job TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL,
+    finding TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class WorkQueue:
+    """Jobs leased to workers for a limited time
+    
+    A job moves queued -> leased -> done. A worker leases the oldest queued
+    job for WORK_LEASE_SECONDS and renews the lease while it works; a lease
+    that runs out (the worker died or hung) puts the job back in the queue.
+    Acknowledging a job stores its findings and marks it done in one
+    transaction, and is refused once the lease has passed to another
+    worker. Jobs are keyed, so enqueueing the same job twice is a no-op and
+    a coordinator can be restarted on the same queue.
+    
+    Every process opens its own connection; SQLite's locking makes the
+    lease atomic between processes (and between machines sharing the file
+    on a filesystem with working locks).
+    """
+    
+    def __init__(self, path, lease_seconds=WORK_LEASE_SECONDS, max_attempts=WORK_MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+    
+    def close(self):
+        self.db.close()
+    
+    def put(self, jobs):
+        """Enqueue (key, job) pairs; return how many were new"""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO jobs (key, job) VALUES (?, ?)",
+                [(key, json.dumps(job)) for key, job in jobs]
+            )
+            added = self.db.total_changes - before
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        return added
+    
+    def seal(self):
+        """Mark that no more jobs will be added, so idle workers can exit"""
+        self.db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('sealed', '1')")
+    
+    def unseal(self):
+        """Clear the seal of an earlier coordinator run, so workers wait for the new jobs"""
+        self.db.execute("DELETE FROM meta WHERE name = 'sealed'")
+    
+    def sealed(self):
+        row = self.db.execute("SELECT value FROM meta WHERE name = 'sealed'").fetchone()
+        return row is not None
+    
+    def lease(self, worker):
+        """Lease the oldest queued job; return (job id, job) or None"""
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            self._requeue_expired(now)
+            row = self.db.execute(
+                "SELECT id, job FROM jobs WHERE state = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self.db.execute(
+                    "UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                    "WHERE id = ?",
+                    (worker, now + self.lease_seconds, row[0])
+                )
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+    
+    def renew(self, job_id, worker):
+        """Extend a lease; False if the job is no longer leased to this worker"""
+        cursor = self.db.execute(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND state = 'leased' AND worker = ?",
+            (time.time() + self.lease_seconds, job_id, worker)
+        )
+        return cursor.rowcount == 1
+    
+    def ack(self, job_id, worker, findings):
+        """Store a finished job's findings and mark it done; False if the lease was lost"""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.db.execute(
+                "UPDATE jobs SET state = 'done', lease_until = NULL "
+                "WHERE id = ? AND state = 'leased' AND worker = ?",
+                (job_id, worker)
+            )
+            if cursor.rowcount == 1:
+                self.db.executemany(
+                    "INSERT INTO findings (job_id, finding) VALUES (?, ?)",
+                    [(job_id, json.dumps(finding, default=str)) for finding in findings]
+                )
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+    
+    def release(self, job_id, worker):
+        """Give a job back after an error; it fails for good after max_attempts leases"""
+        self.db.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "worker = NULL, lease_until = NULL WHERE id = ? AND state = 'leased' AND worker = ?",
+            (self.max_attempts, job_id, worker)
+        )
+    
+    def requeue_expired(self):
+        """Put jobs whose lease ran out back in the queue; return how many"""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            count = self._requeue_expired(time.time())
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        return count
+    
+    def _requeue_expired(self, now):
+        """Requeue expired leases (transaction held)"""
+        cursor = self.db.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "worker = NULL, lease_until = NULL WHERE state = 'leased' AND lease_until < ?",
+            (self.max_attempts, now)
+        )
+        return cursor.rowcount
+    
+    def counts(self):
+        """{state: number of jobs}"""
+        counts = {'queued': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        for state, count in self.db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"):
+            counts[state] = count
+        return counts
+    
+    def findings(self):
+        """All findings acknowledged so far, in the order they were stored"""
+        return [json.loads(row[0]) for row in self.db.execute("SELECT finding FROM findings ORDER BY id")]